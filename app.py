@@ -1,19 +1,31 @@
 import os
+import time
 import streamlit as st
 from dotenv import load_dotenv
-from streamlit_autorefresh import st_autorefresh
 
-from config import CITIES_BY_REGION, ALL_CITIES, DEFAULT_CITIES, REFRESH_OPTIONS
-from utils import validate_api_key, fetch_weather, init_session_state
-from ui_components import (
-    render_header, render_country_buttons, render_weather_card,
-    render_comparison_table, render_footer
+from config import (
+    CITIES_BY_REGION, UNIQUE_CITIES, DEFAULT_CITIES, REFRESH_OPTIONS, ALL_CITIES_OPTION, REGION_OPTIONS,
+    REGION_POSITION, CITY_REGIONS
 )
+from gazetteer import get_gazetteer
+from utils import init_session_state
+from weather_api import validate_api_key
+from ui_components import render_header, render_country_buttons, render_footer, render_debug_panel
+from metrics import metrics, start_exporter
+from history import enable_history_db
+from dashboard import render_dashboard, refresh_interval
 import styles
 
 load_dotenv()
 API_KEY = os.getenv("OPENWEATHER_API_KEY")
-BASE_URL = "https://api.openweathermap.org/data/2.5/weather"
+BASE_URL = os.getenv("OPENWEATHER_BASE_URL", "https://api.openweathermap.org/data/2.5/weather")
+BACKGROUND_POLLING = os.getenv("OPENWEATHER_BACKGROUND_POLLING", "1") == "1"
+STALE_WHILE_REVALIDATE = BACKGROUND_POLLING and os.getenv("OPENWEATHER_STALE_WHILE_REVALIDATE", "1") == "1"
+DEBUG_PANEL = os.getenv("WEATHER_DEBUG_PANEL", "0") == "1"
+
+script_started = time.perf_counter()
+start_exporter()
+enable_history_db()
 
 #!PAGE CONFIGURATION
 st.set_page_config(
@@ -23,14 +35,13 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-st.markdown(styles.hide_streamlit_elements(), unsafe_allow_html=True)
-st.markdown(styles.get_custom_css(), unsafe_allow_html=True)
+st.markdown(styles.get_page_styles(), unsafe_allow_html=True)
 
 #!INITIALIZATION
 init_session_state()
 
 if "selected_region" not in st.session_state:
-    st.session_state.selected_region = "All Cities"
+    st.session_state.selected_region = ALL_CITIES_OPTION
 
 if not validate_api_key(API_KEY):
     st.error("⚠️ Missing or invalid API key!")
@@ -53,11 +64,8 @@ st.sidebar.divider()
 st.sidebar.markdown("#### 📋 Or Use Dropdown")
 selected_region_dropdown = st.sidebar.selectbox(
     "Choose a country",
-    ["All Cities"] + list(CITIES_BY_REGION.keys()),
-    index=0 if st.session_state.selected_region == "All Cities" else (
-        list(CITIES_BY_REGION.keys()).index(st.session_state.selected_region) + 1
-        if st.session_state.selected_region in CITIES_BY_REGION.keys() else 0
-    ),
+    REGION_OPTIONS,
+    index=REGION_POSITION.get(st.session_state.selected_region, 0),
     label_visibility="collapsed"
 )
 
@@ -65,14 +73,15 @@ if selected_region_dropdown != st.session_state.selected_region:
     st.session_state.selected_region = selected_region_dropdown
 
 selected_region = st.session_state.selected_region
-available_cities = CITIES_BY_REGION[selected_region] if selected_region != "All Cities" else ALL_CITIES
+all_cities = selected_region == ALL_CITIES_OPTION
+available_cities = UNIQUE_CITIES if all_cities else CITIES_BY_REGION[selected_region]
 
 #! City selection
 st.sidebar.markdown("#### 🏙️ Select Cities")
 selected_cities = st.sidebar.multiselect(
     "Choose cities to monitor",
     options=available_cities,
-    default=[c for c in DEFAULT_CITIES if c in available_cities][:3],
+    default=[c for c in DEFAULT_CITIES if all_cities or selected_region in CITY_REGIONS.get(c, ())][:3],
     label_visibility="collapsed"
 )
 
@@ -84,8 +93,32 @@ custom_city = st.sidebar.text_input(
     label_visibility="collapsed"
 )
 
-if custom_city and custom_city.strip() and custom_city.strip() not in selected_cities:
-    selected_cities.append(custom_city.strip())
+custom_city = custom_city.strip()
+if custom_city:
+    # Checked against the offline gazetteer first, so a typo never costs an API round-trip.
+    gazetteer = get_gazetteer()
+    place = gazetteer.resolve(custom_city)
+    if place is not None:
+        custom_city = place.label
+    else:
+        suggestions = [p.label for p in gazetteer.suggest(custom_city)]
+        options = list(suggestions)
+        typed = custom_city
+        if not gazetteer.complete:
+            # Only the catalog is known offline; the typed name may still be a real city, so it
+            # stays on offer, but it is only picked for the user when nothing else matches.
+            options.append(typed)
+        if options:
+            custom_city = st.sidebar.selectbox(
+                "Did you mean", options, index=None if suggestions else 0,
+                format_func=lambda option: f"Use “{option}” as typed" if option == typed else option,
+                placeholder="Did you mean…", label_visibility="collapsed")
+        else:
+            st.sidebar.warning(f"Unknown city: {custom_city}")
+            custom_city = None
+
+if custom_city and custom_city not in selected_cities:
+    selected_cities.append(custom_city)
 
 st.sidebar.divider()
 
@@ -93,6 +126,9 @@ st.sidebar.divider()
 st.sidebar.markdown("### 📊 Display Options")
 show_metrics = st.sidebar.checkbox("📋 Show detailed metrics", value=True)
 show_comparison = st.sidebar.checkbox("📊 Show comparison table", value=False)
+show_history = st.sidebar.checkbox("📈 Show history chart", value=False)
+show_forecast = st.sidebar.checkbox("🗓️ Show 5-day forecast", value=False)
+show_map = st.sidebar.checkbox("🗺️ Map view", value=False)
 
 st.sidebar.divider()
 
@@ -105,38 +141,26 @@ selected_refresh = st.sidebar.selectbox(
     label_visibility="collapsed"
 )
 
-st_autorefresh(interval=REFRESH_OPTIONS[selected_refresh] * 1000, key="weather_autorefresh")
+max_age = REFRESH_OPTIONS[selected_refresh]
+
+show_debug = DEBUG_PANEL and st.sidebar.checkbox("🐞 Show debug metrics", value=False)
 
 #! DATA FETCHING
 if not selected_cities:
     st.warning("Please select at least one city to monitor.")
     st.stop()
 
-current_data = []
-with st.spinner("Fetching weather data..."):
-    for city in selected_cities:
-        record = fetch_weather(city, API_KEY, BASE_URL)
-        if record:
-            current_data.append(record)
-
-if not current_data:
-    st.warning("No data available. Please check your API key or city selection.")
-    st.stop()
-
-#! WEATHER DISPLAY
-st.markdown("<h2 style='color: white; margin-top: 2rem; font-weight: 600; letter-spacing: -0.02em;'>📍 Current Weather</h2>", 
-            unsafe_allow_html=True)
-
-num_cols = min(4, max(1, len(current_data)))
-cols = st.columns(num_cols, gap="medium")
-
-for idx, record in enumerate(current_data):
-    with cols[idx % len(cols)]:
-        render_weather_card(record, show_metrics)
-
-#! COMPARISON TABLE
-if show_comparison and len(current_data) > 1:
-    render_comparison_table(current_data)
+# Only the weather region reruns on the refresh timer; the sidebar, CSS, header and footer
+# rerun on user interaction alone.
+weather_fragment = st.fragment(render_dashboard, run_every=refresh_interval(max_age))
+weather_fragment(
+    selected_cities, selected_region, max_age, show_metrics, show_comparison, show_history,
+    API_KEY, BASE_URL, BACKGROUND_POLLING, STALE_WHILE_REVALIDATE, show_forecast, show_map,
+)
 
 #! FOOTER
 render_footer()
+
+metrics.observe("weather_phase_seconds", time.perf_counter() - script_started, phase="script")
+if show_debug:
+    render_debug_panel()
@@ -0,0 +1,6 @@
+import os
+
+# Benchmarks drive app.py and the fetch core against the stub server; its made-up observations
+# must never reach the real history database. Runs before any benchmark module imports history_db,
+# and subprocesses inherit it.
+os.environ["WEATHER_HISTORY_DB"] = ""
@@ -0,0 +1,26 @@
+# Shared by the benchmarks that drive the dashboard through Streamlit's AppTest.
+
+
+def fragment_script(region, show_comparison):
+    # Exactly the work one fragment tick does: the data region and nothing else. AppTest runs
+    # this function's source on its own, so everything it needs is imported inside it.
+    import os
+    import streamlit as st
+    from dashboard import render_dashboard
+    from utils import init_session_state
+
+    init_session_state()
+    render_dashboard(st.session_state.cities, region, 60, True, show_comparison, False,
+                     os.environ["OPENWEATHER_API_KEY"], os.environ["OPENWEATHER_BASE_URL"])
+
+
+def fragment_app(region=None, show_comparison=True, default_timeout: float = 60):
+    from streamlit.testing.v1 import AppTest
+
+    return AppTest.from_function(fragment_script, default_timeout=default_timeout,
+                                 args=(region, show_comparison))
+
+
+def payload_bytes(at) -> int:
+    # Serialized size of every element delta the run produced, i.e. what goes over the websocket.
+    return sum(node.proto.ByteSize() for node in at._tree if getattr(node, "proto", None) is not None)
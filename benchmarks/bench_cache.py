@@ -0,0 +1,47 @@
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Point the catalog index at a scratch file before city_index reads the setting.
+INDEX_PATH = os.path.join(tempfile.mkdtemp(), "city_index.json")
+os.environ["CITY_INDEX_PATH"] = INDEX_PATH
+
+from benchmarks.fake_openweather import serve  # noqa: E402
+from city_index import build_city_index  # noqa: E402
+from config import DEFAULT_CITIES  # noqa: E402
+from weather_api import fetch_weather_many  # noqa: E402
+from weather_cache import weather_cache  # noqa: E402
+
+API_KEY = "benchmark-api-key"
+LATENCY = 0.1
+SESSIONS = 50
+TICKS = 3
+
+
+def run(server, base_url):
+    weather_cache.clear()
+    calls = server.calls
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        with ThreadPoolExecutor(max_workers=SESSIONS) as pool:
+            list(pool.map(lambda _: fetch_weather_many(DEFAULT_CITIES, API_KEY, base_url), range(SESSIONS)))
+    return server.calls - calls, time.perf_counter() - start
+
+
+def main():
+    server, base_url = serve(LATENCY)
+    lookups = SESSIONS * TICKS * len(DEFAULT_CITIES)
+    print(f"{SESSIONS} sessions x {TICKS} ticks x {len(DEFAULT_CITIES)} cities = {lookups} lookups")
+    # ?q= per city first, then /group batches once the catalog index exists.
+    for mode in ("?q=", "/group"):
+        if mode == "/group":
+            build_city_index(API_KEY, base_url, INDEX_PATH)
+        calls, elapsed = run(server, base_url)
+        print(f"{mode:>7}  upstream calls: {calls}  wall time: {elapsed:.3f} s")
+        print("         cache:", weather_cache.stats())
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import time
+
+import cadence as cadence_module
+from benchmarks.fake_openweather import serve
+from cadence import cadence
+from config import DEFAULT_CITIES
+from weather_api import fetch_weather_many
+from weather_cache import weather_cache
+
+API_KEY = "benchmark-api-key"
+LATENCY = 0.02
+# Scaled-down stand-ins for a 10-minute observation cadence and a 1-minute refresh.
+UPDATE_INTERVAL = 4.0
+MAX_AGE = 0.5
+DURATION = 20.0
+
+
+def run(server, base_url, enabled: bool):
+    weather_cache.clear()
+    cadence.clear()
+    cadence.enabled = enabled
+
+    calls_before = server.calls
+    seen = {}
+    delays = []
+    end = time.time() + DURATION
+    while time.time() < end:
+        for result in fetch_weather_many(DEFAULT_CITIES, API_KEY, base_url, max_age=MAX_AGE):
+            observed_at = result.record.observed_at
+            if seen.get(result.city) != observed_at:
+                if result.city in seen:
+                    delays.append(time.time() - observed_at)
+                seen[result.city] = observed_at
+        time.sleep(MAX_AGE / 2)
+    delays.sort()
+    return server.calls - calls_before, delays
+
+
+def main():
+    server, base_url = serve(LATENCY)
+    server.update_interval = UPDATE_INTERVAL
+    cadence_module.CADENCE_MIN = 1.0
+
+    print(f"{len(DEFAULT_CITIES)} cities, new observation every {UPDATE_INTERVAL:.0f} s, "
+          f"refresh every {MAX_AGE} s, {DURATION:.0f} s run")
+    print(f"{'cadence':>8} {'requests':>9} {'updates':>8} {'median delay (s)':>17} {'max delay (s)':>14}")
+    for enabled in (False, True):
+        calls, delays = run(server, base_url, enabled)
+        median = delays[len(delays) // 2] if delays else float("nan")
+        worst = delays[-1] if delays else float("nan")
+        print(f"{'on' if enabled else 'off':>8} {calls:>9} {len(delays):>8} {median:>17.2f} {worst:>14.2f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import statistics
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.apptest_helpers import payload_bytes
+
+ROWS = 400
+RUNS = 5
+
+
+def styler_script():
+    # The previous renderer: Styler with two background_gradient passes, then four scans.
+    import pandas as pd
+    import streamlit as st
+    from benchmarks.bench_grid import sample_records
+
+    records = sample_records(st.session_state.n)
+    df = pd.DataFrame(records)[['city', 'temp', 'feels_like', 'humidity', 'wind', 'pressure', 'description']]
+    df.columns = ['City', 'Temp (°C)', 'Feels Like (°C)', 'Humidity (%)', 'Wind (m/s)', 'Pressure (hPa)', 'Weather']
+    st.dataframe(
+        df.style.format({'Temp (°C)': '{:.1f}', 'Feels Like (°C)': '{:.1f}', 'Wind (m/s)': '{:.1f}',
+                         'Humidity (%)': '{:.0f}', 'Pressure (hPa)': '{:.0f}'})
+          .background_gradient(cmap='RdYlBu_r', subset=['Temp (°C)', 'Feels Like (°C)'])
+          .background_gradient(cmap='Blues', subset=['Humidity (%)']),
+        hide_index=True,
+    )
+    for column, pick in (('Temp (°C)', 'idxmax'), ('Temp (°C)', 'idxmin'),
+                         ('Humidity (%)', 'idxmax'), ('Wind (m/s)', 'idxmax')):
+        row = df.loc[getattr(df[column], pick)()]
+        st.metric(column, row['City'], f"{row[column]:.1f}")
+
+
+def vectorized_script():
+    import streamlit as st
+    from benchmarks.bench_grid import sample_records
+    from ui_components import render_comparison_table
+
+    render_comparison_table(sample_records(st.session_state.n))
+
+
+def measure(script, n):
+    at = AppTest.from_function(script, default_timeout=120)
+    at.session_state.n = n
+    at.run()
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - start)
+    payload = payload_bytes(at)
+    return statistics.median(times), payload
+
+
+def compute_only(n):
+    from benchmarks.bench_grid import sample_records
+    from comparison import compare, sort_rows
+
+    records = sample_records(n)
+    start = time.perf_counter()
+    for _ in range(100):
+        comparison = compare(records)
+        sort_rows(comparison, "temp", descending=True)
+    return (time.perf_counter() - start) / 100
+
+
+def main():
+    print(f"{ROWS} rows, median of {RUNS} reruns")
+    print(f"{'renderer':>10} {'time (ms)':>10} {'payload (B)':>12}")
+    for name, script in (("styler", styler_script), ("vectorized", vectorized_script)):
+        elapsed, payload = measure(script, ROWS)
+        print(f"{name:>10} {elapsed * 1000:>10.1f} {payload:>12}")
+    print(f"compare() + sort_rows(): {compute_only(ROWS) * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
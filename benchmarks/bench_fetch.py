@@ -0,0 +1,33 @@
+import time
+
+from benchmarks.fake_openweather import serve
+from config import ALL_CITIES
+from weather_api import fetch_weather_many, request_weather
+from weather_cache import weather_cache
+
+API_KEY = "benchmark-api-key"
+LATENCY = 0.1
+SIZES = [1, 5, 10, 20, 40]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    server, base_url = serve(LATENCY)
+    print(f"Stub latency: {LATENCY * 1000:.0f} ms per request")
+    print(f"{'cities':>6} {'serial (s)':>11} {'batch (s)':>10} {'speedup':>8}")
+    for n in SIZES:
+        cities = ALL_CITIES[:n]
+        serial = timed(lambda: [request_weather(c, API_KEY, base_url) for c in cities])
+        weather_cache.clear()
+        batch = timed(lambda: fetch_weather_many(cities, API_KEY, base_url))
+        print(f"{n:>6} {serial:>11.3f} {batch:>10.3f} {serial / batch:>7.1f}x")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
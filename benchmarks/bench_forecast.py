@@ -0,0 +1,59 @@
+import time
+
+import numpy as np
+
+from benchmarks.fake_openweather import forecast_payload, serve
+from config import ALL_CITIES
+from forecast import FORECAST_DAYS, _parse_forecast, current_cycle, daily_summary, fetch_forecasts
+
+API_KEY = "benchmark-api-key"
+CITIES = 400
+TICKS = 5
+RUNS = 20
+
+
+def per_city_summary(forecasts, now):
+    # The straightforward version: a Python loop over cities, days and steps.
+    rows = []
+    for f in forecasts:
+        first_day = (now + f.timezone) // 86400
+        days = [[] for _ in range(FORECAST_DAYS)]
+        for t, temp, rain in zip(f.times, f.temp, f.precipitation):
+            if np.isnan(temp):
+                continue
+            d = int((t + f.timezone) // 86400 - first_day)
+            if 0 <= d < FORECAST_DAYS:
+                days[d].append((temp, rain))
+        rows.append([(min(v[0] for v in day), max(v[0] for v in day), sum(v[0] for v in day) / len(day),
+                      sum(v[1] for v in day)) if day else None for day in days])
+    return rows
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        func(*args)
+    return (time.perf_counter() - start) / RUNS
+
+
+def main():
+    cities = [f"{ALL_CITIES[i % len(ALL_CITIES)]}-{i}" for i in range(CITIES)]
+    forecasts = [_parse_forecast(forecast_payload(city), current_cycle()) for city in cities]
+    now = time.time()
+    print(f"daily summary of {CITIES} cities x 40 steps")
+    print(f"  per-city loop {timed(per_city_summary, forecasts, now) * 1000:8.2f} ms")
+    print(f"  vectorized    {timed(daily_summary, forecasts, now) * 1000:8.2f} ms")
+
+    server, base_url = serve(0.02)
+    watched = ALL_CITIES[:60]
+    print(f"fetch_forecasts for {len(watched)} cities over {TICKS} refresh ticks")
+    for tick in range(TICKS):
+        calls = server.calls
+        start = time.perf_counter()
+        fetch_forecasts(watched, API_KEY, base_url)
+        print(f"  tick {tick}: {server.calls - calls:3d} upstream calls, {(time.perf_counter() - start) * 1000:7.1f} ms")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
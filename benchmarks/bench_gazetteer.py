@@ -0,0 +1,63 @@
+import gzip
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from gazetteer import build_gazetteer, load_gazetteer
+
+PLACES = 200_000
+QUERIES = ["Amsterdam", "Amsterdm", "New", "Ho Chi Min", "Sidney", "Cordoba, ES", "Zzyzx"]
+RUNS = 50
+SYLLABLES = ["ka", "lo", "mar", "ten", "ber", "vi", "san", "to", "ri", "na", "gel", "port", "ham", "do", "sk"]
+
+
+def city_list(n):
+    # Same shape as OpenWeather's city.list.json: real names plus random filler.
+    rng = random.Random(7)
+    real = [("Amsterdam", "NL"), ("New York", "US"), ("Newcastle", "AU"), ("Ho Chi Minh City", "VN"),
+            ("Sydney", "AU"), ("Córdoba", "ES"), ("Córdoba", "AR")]
+    cities = [{"id": i, "name": name, "country": cc, "coord": {"lat": 0.0, "lon": 0.0}}
+              for i, (name, cc) in enumerate(real)]
+    for i in range(len(real), n):
+        name = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+        cities.append({"id": i, "name": name, "country": "XX",
+                       "coord": {"lat": rng.uniform(-90, 90), "lon": rng.uniform(-180, 180)}})
+    return cities
+
+
+def timed(fn, *args):
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        result = fn(*args)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times) * 1000, result
+
+
+def main():
+    workdir = tempfile.mkdtemp()
+    source = os.path.join(workdir, "city.list.json.gz")
+    with gzip.open(source, "wt", encoding="utf-8") as f:
+        json.dump(city_list(PLACES), f)
+
+    start = time.perf_counter()
+    count = build_gazetteer(source, os.path.join(workdir, "gazetteer"))
+    build = time.perf_counter() - start
+    start = time.perf_counter()
+    gazetteer = load_gazetteer(os.path.join(workdir, "gazetteer"))
+    load = time.perf_counter() - start
+
+    print(f"{count} places: build {build:.1f} s (one-off), load {load * 1000:.1f} ms (memory-mapped)")
+    print(f"{'query':>14} {'resolve (ms)':>13} {'suggest (ms)':>13}  suggestions")
+    for query in QUERIES:
+        resolve_ms, place = timed(gazetteer.resolve, query)
+        suggest_ms, places = timed(gazetteer.suggest, query)
+        found = place.label if place else ", ".join(p.label for p in places[:3]) or "-"
+        print(f"{query:>14} {resolve_ms:>13.3f} {suggest_ms:>13.3f}  {found}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import statistics
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.apptest_helpers import payload_bytes
+from observation import Observation
+
+SIZES = [10, 100, 400]
+RUNS = 5
+
+
+def per_card_script():
+    import streamlit as st
+    from benchmarks.bench_grid import sample_records
+    from ui_components import render_weather_card
+
+    st.session_state.setdefault("card_states", {})
+    records = sample_records(st.session_state.n, st.session_state.version)
+    cols = st.columns(4, gap="medium")
+    for idx, record in enumerate(records):
+        with cols[idx % len(cols)]:
+            render_weather_card(record, True, age=12.0, max_age=60)
+
+
+def grid_script():
+    import streamlit as st
+    from benchmarks.bench_grid import sample_records
+    from ui_components import render_weather_grid
+
+    st.session_state.setdefault("card_states", {})
+    records = sample_records(st.session_state.n, st.session_state.version)
+    render_weather_grid(records, True, ages={r.city: 12.0 for r in records}, max_age=60)
+
+
+def sample_records(n, version=0):
+    # Bumping the version changes every observation (and its digest).
+    return [Observation(
+        f"City {i}", 1704110400.0, 1704110400.0, -5 + i % 40 + version / 10, -6 + i % 40, 40 + i % 60,
+        1000 + i % 30, 1.5 + i % 10, "Scattered Clouds", hash((i, version)),
+    ) for i in range(n)]
+
+
+def measure(script, n, changing):
+    at = AppTest.from_function(script, default_timeout=120)
+    at.session_state.n = n
+    at.session_state.version = 0
+    at.run()
+    times = []
+    for _ in range(RUNS):
+        if changing:
+            at.session_state.version += 1
+        start = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - start)
+    payload = payload_bytes(at)
+    return statistics.median(times), payload, sum(1 for _ in at._tree)
+
+
+def main():
+    print(f"{'cities':>6} {'renderer':>9} {'data':>9} {'time (ms)':>10} {'payload (B)':>12} {'nodes':>6}")
+    for n in SIZES:
+        for name, script in (("per-card", per_card_script), ("grid", grid_script)):
+            for changing in (True, False):
+                elapsed, payload, nodes = measure(script, n, changing)
+                data = "changed" if changing else "unchanged"
+                print(f"{n:>6} {name:>9} {data:>9} {elapsed * 1000:>10.1f} {payload:>12} {nodes:>6}")
+
+
+if __name__ == "__main__":
+    main()
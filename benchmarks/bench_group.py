@@ -0,0 +1,44 @@
+import os
+import tempfile
+import time
+
+# Point the catalog index at a scratch file before city_index reads the setting.
+INDEX_PATH = os.path.join(tempfile.mkdtemp(), "city_index.json")
+os.environ["CITY_INDEX_PATH"] = INDEX_PATH
+
+from benchmarks.fake_openweather import serve  # noqa: E402
+from city_index import build_city_index  # noqa: E402
+from config import ALL_CITIES  # noqa: E402
+from weather_api import fetch_weather_many  # noqa: E402
+from weather_cache import weather_cache  # noqa: E402
+
+API_KEY = "benchmark-api-key"
+LATENCY = 0.05
+
+
+def run(base_url, server, **kwargs):
+    weather_cache.clear()
+    calls_before = server.calls
+    start = time.perf_counter()
+    results = fetch_weather_many(ALL_CITIES, API_KEY, base_url, **kwargs)
+    elapsed = time.perf_counter() - start
+    ok = sum(1 for r in results if r.record)
+    return elapsed, server.calls - calls_before, ok
+
+
+def main():
+    server, base_url = serve(LATENCY)
+    by_name = run(base_url, server)
+
+    count = build_city_index(API_KEY, base_url, INDEX_PATH)
+    by_id = run(base_url, server)
+
+    print(f"Catalog: {len(ALL_CITIES)} cities, {count} resolved to IDs")
+    print(f"{'mode':>8} {'time (s)':>9} {'requests':>9} {'records':>8}")
+    for mode, (elapsed, calls, ok) in (("?q=", by_name), ("/group", by_id)):
+        print(f"{mode:>8} {elapsed:>9.3f} {calls:>9} {ok:>8}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import time
+
+from config import ALL_CITIES, MAX_HISTORY_RECORDS
+from history import HistoryStore, history_memory_bytes
+from observation import Observation
+
+APPENDS_PER_CITY = 1000
+
+
+def main():
+    store = HistoryStore()
+    cities = ALL_CITIES
+    record = Observation("", 0.0, None, 21.5, 20.0, 60, 1012, 3.2, "Clear Sky", 0)
+
+    start = time.perf_counter()
+    for i in range(APPENDS_PER_CITY):
+        for city in cities:
+            store.append(city, record._replace(timestamp=float(i)))
+    append = time.perf_counter() - start
+    appends = APPENDS_PER_CITY * len(cities)
+
+    start = time.perf_counter()
+    for city in cities:
+        store.window(city)
+    window = time.perf_counter() - start
+
+    print(f"{len(cities)} cities x {MAX_HISTORY_RECORDS} records")
+    print(f"memory: {store.nbytes() / 1024:.0f} KiB "
+          f"(predicted {history_memory_bytes(len(cities)) / 1024:.0f} KiB)")
+    print(f"append: {append * 1e6 / appends:.2f} us/record over {appends} records")
+    print(f"window: {window * 1e6 / len(cities):.2f} us/city (views, no copy)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import os
+import tempfile
+import time
+
+from config import ALL_CITIES, HISTORY_FIELDS, MAX_HISTORY_RECORDS
+from history import HistoryStore
+from history_db import HistoryDB
+
+DAYS = 14
+INTERVAL = 600
+
+
+def main():
+    path = os.path.join(tempfile.mkdtemp(), "history.db")
+    cities = list(dict.fromkeys(ALL_CITIES))
+    start_ts = time.time() - DAYS * 86400
+    steps = DAYS * 86400 // INTERVAL
+    values = (21.5, 20.0, 60.0, 1012.0, 3.2)
+
+    db = HistoryDB(path)
+    start = time.perf_counter()
+    for step in range(steps):
+        ts = start_ts + step * INTERVAL
+        for city in cities:
+            db.submit(city, ts, values)
+        if step % 20 == 19:
+            db.flush()
+    db.flush()
+    ingest = time.perf_counter() - start
+    rows = steps * len(cities)
+
+    # A fresh process: open the file and hydrate one city's ring buffer.
+    start = time.perf_counter()
+    store = HistoryStore(db=HistoryDB(path))
+    store.window(cities[0])
+    startup = time.perf_counter() - start
+
+    now = time.time()
+    timings = {}
+    for label, span, resolution in (("1 day raw", 86400, "raw"), ("7 days 1h", 7 * 86400, "1h"),
+                                    ("14 days 1d", 14 * 86400, "1d")):
+        start = time.perf_counter()
+        data = store.load_range(cities[0], now - span, now, resolution)
+        timings[label] = (time.perf_counter() - start, len(data["timestamp"]))
+
+    print(f"{len(cities)} cities x {DAYS} days every {INTERVAL // 60} min = {rows} rows "
+          f"({len(HISTORY_FIELDS)} metrics), db {os.path.getsize(path) / 2**20:.0f} MiB")
+    print(f"ingest incl. rollups: {rows / ingest:,.0f} rows/s")
+    print(f"open + hydrate {MAX_HISTORY_RECORDS} points: {startup * 1000:.1f} ms")
+    for label, (elapsed, n) in timings.items():
+        print(f"range {label:>11}: {elapsed * 1000:6.2f} ms, {n} points")
+
+
+if __name__ == "__main__":
+    main()
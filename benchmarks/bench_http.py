@@ -0,0 +1,33 @@
+import time
+
+import requests
+
+from benchmarks.fake_openweather import serve
+from http_client import get_json
+
+API_KEY = "benchmark-api-key"
+REQUESTS = 200
+
+
+def main():
+    server, base_url = serve(latency=0)
+    params = {"q": "London", "appid": API_KEY, "units": "metric"}
+
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        requests.get(base_url, params=params, timeout=10).json()
+    bare = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        get_json(base_url, params, timeout=10, attempts=1)
+    pooled = time.perf_counter() - start
+
+    print(f"{REQUESTS} sequential requests to a zero-latency stub (plain HTTP, no TLS)")
+    print(f"  requests.get per call: {bare * 1000 / REQUESTS:.2f} ms/request")
+    print(f"  pooled keep-alive:     {pooled * 1000 / REQUESTS:.2f} ms/request")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import random
+import statistics
+import time
+
+from benchmarks.fake_openweather import serve
+from config import ALL_CITIES
+from ingestion import IngestionScheduler
+
+API_KEY = "benchmark-api-key"
+LATENCY = 0.1
+SESSIONS = 50
+CITIES_PER_SESSION = 8
+MAX_AGE = 2.0
+CALLS_PER_MINUTE = 300
+DURATION = 10.0
+
+
+def main():
+    server, base_url = serve(LATENCY)
+    scheduler = IngestionScheduler(API_KEY, base_url, calls_per_minute=CALLS_PER_MINUTE)
+    rng = random.Random(0)
+    sessions = {f"s{i}": rng.sample(ALL_CITIES[:60], CITIES_PER_SESSION) for i in range(SESSIONS)}
+
+    # Warm the snapshot so the measured reruns reflect steady state.
+    for session_id, cities in sessions.items():
+        scheduler.entries(session_id, cities, None, MAX_AGE)
+    warm_calls = server.calls
+    scheduler.start()
+
+    latencies = []
+    start = time.perf_counter()
+    while time.perf_counter() - start < DURATION:
+        for session_id, cities in sessions.items():
+            t = time.perf_counter()
+            scheduler.entries(session_id, cities, None, MAX_AGE)
+            latencies.append(time.perf_counter() - t)
+        time.sleep(0.25)
+    scheduler.stop()
+
+    latencies.sort()
+    calls = server.calls - warm_calls
+    print(f"{SESSIONS} sessions, {len(latencies)} reruns over {DURATION:.0f} s, max_age {MAX_AGE} s")
+    print(f"rerun latency p50 {statistics.median(latencies) * 1e6:.0f} us, "
+          f"p95 {latencies[int(len(latencies) * 0.95)] * 1e6:.0f} us")
+    print(f"upstream calls {calls} ({calls * 60 / DURATION:.0f}/min, budget {CALLS_PER_MINUTE}/min)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import argparse
+import heapq
+import json
+import os
+import random
+import resource
+import statistics
+import time
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+API_KEY = "benchmark-api-key-0000"
+
+
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Peak rather than current outside Linux; still an upper bound per session.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Drive app.py headlessly with simulated sessions")
+    parser.add_argument("--sessions", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--tick", type=float, default=2.0, help="seconds between refresh ticks per session")
+    parser.add_argument("--cities-per-session", type=int, default=6)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--calls-per-minute", type=int, default=600)
+    parser.add_argument("--refresh", default="30 seconds", help="one of config.REFRESH_OPTIONS")
+    parser.add_argument("--update-interval", type=float, default=60.0,
+                        help="seconds between new observations per city on the stub")
+    parser.add_argument("--json", help="write the report here, e.g. to keep as a baseline")
+    parser.add_argument("--baseline", help="a report written earlier with --json to compare against")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    # The app reads this at import, so it is set before the first AppTest run.
+    os.environ["OPENWEATHER_CALLS_PER_MINUTE"] = str(args.calls_per_minute)
+    from benchmarks.fake_openweather import serve
+    server, base_url = serve(args.latency, error_rate=args.error_rate, throttle_rate=args.throttle_rate)
+    server.update_interval = args.update_interval
+    os.environ["OPENWEATHER_API_KEY"] = API_KEY
+    os.environ["OPENWEATHER_BASE_URL"] = base_url
+    from streamlit.testing.v1 import AppTest
+    from config import UNIQUE_CITIES
+
+    # Import the app's modules once so their cost is not charged to the first session.
+    warmup = AppTest.from_file(APP, default_timeout=60)
+    warmup.run()
+    rng = random.Random(0)
+    baseline_rss = rss_bytes()
+
+    sessions = []
+    for _ in range(args.sessions):
+        at = AppTest.from_file(APP, default_timeout=60)
+        at.run()
+        at.sidebar.multiselect[0].set_value(rng.sample(UNIQUE_CITIES[:80], args.cities_per_session))
+        next(s for s in at.sidebar.selectbox if s.label == "Auto-refresh interval").select(args.refresh)
+        at.run()
+        sessions.append(at)
+    per_session = (rss_bytes() - baseline_rss) / args.sessions
+
+    latencies = []
+    exceptions = 0
+    calls_before, errors_before, throttled_before = server.calls, server.errors, server.throttled
+    started = time.perf_counter()
+    # Each session ticks on its own timer, staggered like real viewers. AppTest instances
+    # share Streamlit's runtime singleton and cannot run in parallel, so one thread serves
+    # the ticks in due order; the poller, caches and upstream still see every session.
+    # AppTest cannot fire fragment timers either, so a tick is a full rerun (an upper bound).
+    due = [(started + rng.uniform(0, args.tick), i) for i in range(len(sessions))]
+    heapq.heapify(due)
+    while True:
+        next_tick, i = heapq.heappop(due)
+        if next_tick - started >= args.duration:
+            break
+        time.sleep(max(0.0, next_tick - time.perf_counter()))
+        t = time.perf_counter()
+        sessions[i].run()
+        latencies.append(time.perf_counter() - t)
+        exceptions += len(sessions[i].exception)
+        heapq.heappush(due, (next_tick + args.tick, i))
+    elapsed = time.perf_counter() - started
+    calls = server.calls - calls_before
+    server.shutdown()
+
+    report = {
+        "sessions": args.sessions,
+        "duration_s": round(elapsed, 1),
+        "reruns": len(latencies),
+        "rerun_p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "rerun_p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "rerun_p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+        "upstream_calls_per_min": round(calls * 60 / elapsed, 1),
+        "upstream_errors": server.errors - errors_before,
+        "upstream_429s": server.throttled - throttled_before,
+        "script_exceptions": exceptions,
+        "memory_per_session_kib": round(per_session / 1024, 1),
+    }
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print(f"{args.sessions} sessions x {args.cities_per_session} cities, tick {args.tick} s, "
+          f"upstream latency {args.latency * 1000:.0f} ms, errors {args.error_rate:.0%}, 429s {args.throttle_rate:.0%}")
+    print(f"{'metric':>24} {'value':>10}" + (f" {'baseline':>10} {'change':>8}" if baseline else ""))
+    for name, value in report.items():
+        line = f"{name:>24} {value:>10}"
+        if name in baseline and isinstance(value, (int, float)):
+            before = baseline[name]
+            change = f"{(value - before) / before:+.0%}" if before else "-"
+            line += f" {before:>10} {change:>8}"
+        print(line)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
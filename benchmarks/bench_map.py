@@ -0,0 +1,51 @@
+import statistics
+import time
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks.apptest_helpers import payload_bytes
+from benchmarks.bench_grid import sample_records
+from config import ALL_CITIES_OPTION, UNIQUE_CITIES
+
+RUNS = 5
+
+
+def map_script():
+    import streamlit as st
+    from benchmarks.bench_map import catalog_records
+    from ui_components import render_weather_map
+
+    render_weather_map(catalog_records(st.session_state.version), st.session_state.region)
+
+
+def catalog_records(version=0):
+    # Every catalog city, with bench_grid's synthetic observations.
+    return [record._replace(city=city) for city, record in zip(UNIQUE_CITIES, sample_records(len(UNIQUE_CITIES), version))]
+
+
+def timed_run(at):
+    start = time.perf_counter()
+    at.run()
+    assert not at.exception, at.exception
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    first, refresh = [], []
+    for _ in range(RUNS):
+        at = AppTest.from_function(map_script, default_timeout=60)
+        at.session_state.region = ALL_CITIES_OPTION
+        at.session_state.version = 0
+        first.append(timed_run(at))
+        # A refresh: same cities, new observations, so only colors and hover values change.
+        at.session_state.version = 1
+        refresh.append(timed_run(at))
+    payload = payload_bytes(at)
+    print(f"map view of {len(UNIQUE_CITIES)} cities, median of {RUNS} runs (includes AppTest overhead)")
+    print(f"  first render {statistics.median(first):8.1f} ms")
+    print(f"  refresh      {statistics.median(refresh):8.1f} ms")
+    print(f"  payload      {payload:8d} B")
+
+
+if __name__ == "__main__":
+    main()
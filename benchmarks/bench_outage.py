@@ -0,0 +1,45 @@
+import time
+
+from benchmarks.fake_openweather import serve
+from config import ALL_CITIES
+from http_client import upstream_breaker
+from weather_api import fetch_weather_many, request_weather_cached
+
+API_KEY = "benchmark-api-key"
+LATENCY = 0.5
+CITIES = ALL_CITIES[:30]
+
+
+def rerun(base_url):
+    start = time.perf_counter()
+    results = fetch_weather_many(CITIES, API_KEY, base_url, max_age=0)
+    return time.perf_counter() - start, sum(1 for r in results if r.record)
+
+
+def main():
+    server, base_url = serve(LATENCY)
+    print(f"{len(CITIES)} cities, stub latency {LATENCY * 1000:.0f} ms")
+
+    elapsed, ok = rerun(base_url)
+    print(f"healthy:            {elapsed:7.3f} s, {ok} records")
+
+    server.fail_status = 503
+    for i in range(3):
+        calls = server.calls
+        elapsed, ok = rerun(base_url)
+        print(f"outage rerun {i + 1}:     {elapsed:7.3f} s, {ok} cached records, "
+              f"{server.calls - calls} upstream calls, breaker {upstream_breaker.state}")
+
+    server.fail_status = 404
+    upstream_breaker.record_success()
+    calls = server.calls
+    start = time.perf_counter()
+    for _ in range(10):
+        request_weather_cached("Atlantis", API_KEY, base_url)
+    print(f"\nunknown city, 10 reruns: {time.perf_counter() - start:.3f} s, "
+          f"{server.calls - calls} upstream call(s)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import os
+import time
+
+from benchmarks.apptest_helpers import fragment_app, payload_bytes
+from benchmarks.fake_openweather import serve
+
+API_KEY = "benchmark-api-key-0000"
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+SELECTIONS = {"cards": 6, "grid": 40}
+REFRESH = 30
+
+
+def main():
+    os.environ["OPENWEATHER_CALLS_PER_MINUTE"] = "6000"
+    server, base_url = serve(0.01)
+    os.environ["OPENWEATHER_API_KEY"] = API_KEY
+    os.environ["OPENWEATHER_BASE_URL"] = base_url
+    from streamlit.testing.v1 import AppTest
+    from config import UNIQUE_CITIES
+
+    print(f"bytes per rerun; a {REFRESH} s refresh is {3600 // REFRESH} ticks per hour per session")
+    print(f"{'selection':>10} {'full rerun (B)':>15} {'tick (B)':>10} {'ticks/hour (KiB)':>17}")
+    for name, n in SELECTIONS.items():
+        cities = UNIQUE_CITIES[:n]
+        full = AppTest.from_file(APP, default_timeout=60)
+        full.run()
+        full.sidebar.multiselect[0].set_value(cities)
+        next(c for c in full.sidebar.checkbox if "comparison" in c.label).check()
+        full.run()
+        time.sleep(2.5)  # let the poller load every city
+        full.run()
+
+        fragment = fragment_app()
+        fragment.session_state.cities = cities
+        fragment.session_state.pending_cities = []
+        fragment.run()
+        tick = payload_bytes(fragment)
+        print(f"{name:>10} {payload_bytes(full):>15} {tick:>10} {tick * 3600 / REFRESH / 1024:>17.0f}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
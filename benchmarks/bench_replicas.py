@@ -0,0 +1,69 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.fake_openweather import serve
+
+API_KEY = "benchmark-api-key"
+REPLICAS = 4
+CITIES = 40
+MAX_AGE = 5.0
+UPDATE_INTERVAL = 10.0
+CALLS_PER_MINUTE = 600
+DURATION = 30.0
+
+
+def replica(base_url: str):
+    # One dashboard replica: its own poller watching the same cities as every other replica.
+    from config import ALL_CITIES
+    from ingestion import IngestionScheduler
+
+    cities = ALL_CITIES[:CITIES]
+    scheduler = IngestionScheduler(API_KEY, base_url, calls_per_minute=CALLS_PER_MINUTE)
+    scheduler.entries("viewer", cities, None, MAX_AGE, block=False)
+    scheduler.start()
+    deadline = time.monotonic() + DURATION
+    while time.monotonic() < deadline:
+        scheduler.watch("viewer", cities, None, MAX_AGE)
+        time.sleep(1.0)
+    scheduler.stop()
+    snapshot = scheduler.snapshot()
+    print(json.dumps({city: [entry.result.record.digest, entry.previous_temp]
+                      for city, entry in snapshot.items() if entry.result.record is not None}))
+
+
+def run(base_url: str, state_db: str, replicas: int):
+    env = dict(os.environ, WEATHER_STATE_DB=state_db)
+    procs = [subprocess.Popen([sys.executable, "-m", "benchmarks.bench_replicas", "--replica", base_url],
+                              env=env, stdout=subprocess.PIPE, text=True) for _ in range(replicas)]
+    snapshots = [json.loads(proc.communicate()[0]) for proc in procs]
+    # A city "agrees" when every replica shows the same observation with the same delta base.
+    agree = sum(1 for city in snapshots[0] if all(s.get(city) == snapshots[0][city] for s in snapshots))
+    return agree, len(snapshots[0])
+
+
+def main():
+    server, base_url = serve(0.05)
+    server.update_interval = UPDATE_INTERVAL
+    print(f"{REPLICAS} replicas x {CITIES} cities for {DURATION:.0f} s, max_age {MAX_AGE} s, "
+          f"new observations every {UPDATE_INTERVAL:.0f} s")
+    print(f"{'state':>10} {'replicas':>8} {'calls/min':>10} {'agreeing cities':>16}")
+    with tempfile.TemporaryDirectory() as tmp:
+        runs = (("per-proc", "", 1), ("per-proc", "", REPLICAS), ("sqlite", os.path.join(tmp, "state.db"), REPLICAS))
+        for name, state_db, replicas in runs:
+            calls = server.calls
+            started = time.perf_counter()
+            agree, total = run(base_url, state_db, replicas)
+            rate = (server.calls - calls) * 60 / (time.perf_counter() - started)
+            print(f"{name:>10} {replicas:>8} {rate:>10.0f} {f'{agree}/{total}':>16}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--replica":
+        replica(sys.argv[2])
+    else:
+        main()
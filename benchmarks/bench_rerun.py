@@ -0,0 +1,50 @@
+import os
+import statistics
+import time
+
+from benchmarks.apptest_helpers import fragment_app, payload_bytes
+from benchmarks.fake_openweather import serve
+
+API_KEY = "benchmark-api-key-0000"
+CITIES = ["London", "Paris", "Tokyo", "Sydney", "New York", "Dubai", "Hanoi", "Berlin",
+          "Madrid", "Rome", "Seoul", "Cairo"]
+RUNS = 10
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def measure(at):
+    at.run()
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), payload_bytes(at), sum(1 for _ in at._tree)
+
+
+def main():
+    server, base_url = serve(0.01)
+    os.environ["OPENWEATHER_API_KEY"] = API_KEY
+    os.environ["OPENWEATHER_BASE_URL"] = base_url
+    from streamlit.testing.v1 import AppTest
+
+    full = AppTest.from_file(APP, default_timeout=60)
+    full.run()
+    full.sidebar.multiselect[0].set_value(CITIES).run()
+    time.sleep(len(CITIES) * 1.2)  # let the poller load every city within its call budget
+    full_time, full_bytes, full_nodes = measure(full)
+
+    fragment = fragment_app("All Cities", show_comparison=False)
+    fragment.session_state.cities = CITIES
+    fragment.session_state.pending_cities = []
+    fragment_time, fragment_bytes, fragment_nodes = measure(fragment)
+
+    print(f"{len(CITIES)} cities, median of {RUNS} runs (AppTest, in-process)")
+    print(f"{'tick':>16} {'time (ms)':>10} {'payload (B)':>12} {'nodes':>6}")
+    print(f"{'full script':>16} {full_time * 1000:>10.1f} {full_bytes:>12} {full_nodes:>6}")
+    print(f"{'fragment only':>16} {fragment_time * 1000:>10.1f} {fragment_bytes:>12} {fragment_nodes:>6}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import ast
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+RUNS = 5
+# Median import time of everything app.py imports, in a fresh interpreter.
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "1000"))
+# Heavy packages that must only load on the code paths that use them. (plotly is left out:
+# Streamlit itself imports it whenever it is installed.)
+LAZY_MODULES = ("pandas", "matplotlib", "seaborn")
+
+
+def app_imports(path=APP_PATH):
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules += [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def importtime(modules):
+    # -X importtime lines: "import time: self [us] | cumulative | <indent>package".
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {', '.join(modules)}"],
+                          cwd=os.path.dirname(APP_PATH), capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - start
+    top_level = {}
+    loaded = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        loaded.add(name.strip())
+        if not name[1:].startswith(" "):
+            top_level[name.strip()] = int(cumulative) / 1000
+    return wall * 1000, top_level, loaded
+
+
+def main():
+    modules = app_imports()
+    runs = [importtime(modules) for _ in range(RUNS)]
+    wall = statistics.median(run[0] for run in runs)
+    runs.sort(key=lambda run: sum(run[1].values()))
+    top_level = runs[len(runs) // 2][1]
+    total = sum(top_level.values())
+
+    print(f"app.py imports: {', '.join(modules)}")
+    print(f"{'package':>24} {'cumulative (ms)':>16}")
+    for name, ms in sorted(top_level.items(), key=lambda item: -item[1])[:10]:
+        print(f"{name:>24} {ms:>16.1f}")
+    print(f"import time: {total:.0f} ms (budget {STARTUP_BUDGET_MS:.0f} ms), process wall time: {wall:.0f} ms")
+
+    eager = sorted({m for m in LAZY_MODULES for run in runs if m in run[2]})
+    failures = []
+    if total > STARTUP_BUDGET_MS:
+        failures.append(f"import time {total:.0f} ms exceeds budget {STARTUP_BUDGET_MS:.0f} ms")
+    if eager:
+        failures.append(f"imported at start-up: {', '.join(eager)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
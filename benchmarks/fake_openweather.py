@@ -0,0 +1,164 @@
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlparse
+
+from city_index import region_country_code
+from config import CITIES_BY_REGION
+
+
+def fake_city_id(city: str) -> int:
+    return zlib.crc32(city.encode("utf-8")) % 10_000_000
+
+
+def city_payload(city: str, update_interval: float = 600) -> dict:
+    # Deterministic per-city values so repeated runs are comparable. Each city publishes a
+    # new observation every update_interval seconds, at its own offset.
+    seed = zlib.crc32(city.encode("utf-8"))
+    offset = seed % update_interval
+    observed_at = (time.time() - offset) // update_interval * update_interval + offset
+    step = int(observed_at // update_interval) % 7
+    return {
+        "id": fake_city_id(city),
+        "name": city.split(",")[0],
+        "coord": {"lat": round(seed % 1800 / 10 - 90, 2), "lon": round(seed % 3600 / 10 - 180, 2)},
+        "sys": {"country": city.split(",")[1] if "," in city else ""},
+        "dt": observed_at,
+        "main": {
+            "temp": round(-5 + seed % 400 / 10 + step / 10, 1),
+            "feels_like": round(-7 + seed % 420 / 10, 1),
+            "humidity": 20 + seed % 80,
+            "pressure": 990 + seed % 40,
+        },
+        "weather": [{"description": "scattered clouds"}],
+        "wind": {"speed": round(seed % 150 / 10, 1)},
+    }
+
+
+def forecast_payload(city: str) -> dict:
+    # 40 three-hour steps from the next step boundary, with a daily swing and some rain.
+    seed = zlib.crc32(city.encode("utf-8"))
+    start = (time.time() // 10800 + 1) * 10800
+    steps = []
+    for k in range(40):
+        dt = start + k * 10800
+        step = {
+            "dt": int(dt),
+            "main": {"temp": round(-5 + seed % 400 / 10 + 5 * math.sin(2 * math.pi * (dt % 86400) / 86400), 1)},
+            "pop": (seed + k) % 10 / 10,
+        }
+        if (seed + k) % 5 == 0:
+            step["rain"] = {"3h": round(seed % 30 / 10, 1)}
+        steps.append(step)
+    return {"cnt": len(steps), "list": steps, "city": {"name": city.split(",")[0], "timezone": seed % 25 * 3600 - 43200}}
+
+
+class FakeOpenWeatherHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        with server.lock:
+            server.calls += 1
+            roll = server.rng.random()
+        time.sleep(server.latency)
+
+        if server.fail_status is not None:
+            self._send(server.fail_status, {"cod": str(server.fail_status), "message": "injected failure"})
+        elif roll < server.throttle_rate:
+            with server.lock:
+                server.throttled += 1
+            self._send(429, {"cod": 429, "message": "rate limit exceeded"}, {"Retry-After": "1"})
+        elif roll < server.throttle_rate + server.error_rate:
+            with server.lock:
+                server.errors += 1
+            self._send(503, {"cod": "503", "message": "injected error"})
+        elif url.path.endswith("/weather") and "q" in query:
+            self._send(200, self._payload(query["q"][0]))
+        elif url.path.endswith("/forecast") and ("q" in query or "id" in query):
+            city = query["q"][0] if "q" in query else server.cities_by_id.get(int(query["id"][0]))
+            if city is None:
+                self._send(404, {"cod": "404", "message": "city not found"})
+                return
+            self._send(200, forecast_payload(city))
+        elif url.path.endswith("/group") and "id" in query:
+            ids = query["id"][0].split(",")
+            if len(ids) > 20:
+                self._send(400, {"cod": "400", "message": "too many ids"})
+                return
+            found = [self._payload(server.cities_by_id[int(i)]) for i in ids if int(i) in server.cities_by_id]
+            self._send(200, {"cnt": len(found), "list": found})
+        else:
+            self._send(404, {"cod": "404", "message": "city not found"})
+
+    def _payload(self, city: str) -> dict:
+        payload = city_payload(city, self.server.update_interval)
+        # Per-city overrides, keyed by the bare name: {"Tokyo": {"main": {...}}}.
+        override = self.server.payloads.get(city.split(",")[0])
+        return {**payload, **override} if override else payload
+
+    def _send(self, status: int, body: dict, headers: Optional[Dict[str, str]] = None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(latency: float = 0.1, port: int = 0, error_rate: float = 0.0, throttle_rate: float = 0.0,
+          seed: int = 0):
+    # error_rate: fraction of requests answered 503; throttle_rate: fraction answered 429.
+    server = ThreadingHTTPServer(("127.0.0.1", port), FakeOpenWeatherHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.error_rate = error_rate
+    server.throttle_rate = throttle_rate
+    server.rng = random.Random(seed)
+    server.calls = 0
+    server.errors = 0
+    server.throttled = 0
+    server.fail_status = None
+    server.payloads = {}
+    server.update_interval = 600
+    server.lock = threading.Lock()
+    # /group can only answer for IDs it has handed out through ?q= lookups of the catalog.
+    server.cities_by_id = {
+        fake_city_id(f"{city},{region_country_code(region)}"): f"{city},{region_country_code(region)}"
+        for region, cities in CITIES_BY_REGION.items() for city in cities
+    }
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}/data/2.5/weather"
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local OpenWeather stand-in")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server, base_url = serve(args.latency, args.port, args.error_rate, args.throttle_rate)
+    print(f"Serving {base_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
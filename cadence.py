@@ -0,0 +1,70 @@
+import threading
+from typing import Dict, Optional
+
+from config import normalize_city
+
+# OpenWeather station data typically updates every 10-20 minutes; estimates stay within this band.
+CADENCE_MIN = 60.0
+CADENCE_MAX = 3600.0
+# How long after the observation time the provider tends to start serving it.
+PUBLISH_LAG_MAX = 300.0
+CADENCE_SMOOTHING = 0.3
+
+
+class _CityCadence:
+    __slots__ = ("observed_at", "interval", "lag")
+
+    def __init__(self, observed_at: float):
+        self.observed_at = observed_at
+        self.interval: Optional[float] = None
+        self.lag: Optional[float] = None
+
+
+class CadenceTracker:
+    # Keyed by city_keys identity, so same-named cities in different countries stay apart.
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._cities: Dict[str, _CityCadence] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, city: str, observed_at: Optional[float], fetched_at: float):
+        if observed_at is None:
+            return
+        key = normalize_city(city)
+        with self._lock:
+            state = self._cities.get(key)
+            if state is None:
+                self._cities[key] = _CityCadence(observed_at)
+                return
+            if observed_at <= state.observed_at:
+                return
+            interval = min(CADENCE_MAX, max(CADENCE_MIN, observed_at - state.observed_at))
+            state.interval = interval if state.interval is None else (
+                CADENCE_SMOOTHING * interval + (1 - CADENCE_SMOOTHING) * state.interval)
+            # Each sample also includes however long we took to poll after publication, so
+            # only the smallest one bounds the real lag; averaging would let it creep upwards.
+            lag = min(PUBLISH_LAG_MAX, max(0.0, fetched_at - observed_at))
+            state.lag = lag if state.lag is None else min(state.lag, lag)
+            state.observed_at = observed_at
+
+    def clear(self):
+        with self._lock:
+            self._cities.clear()
+
+    def next_expected(self, city: str) -> Optional[float]:
+        with self._lock:
+            state = self._cities.get(normalize_city(city))
+            if state is None or state.interval is None:
+                return None
+            return state.observed_at + state.interval + state.lag
+
+    def new_data_expected(self, city: str, now: float) -> bool:
+        # Until a cadence has been learned, or once the expected time has passed without a new
+        # observation, callers fall back to polling on their normal interval.
+        if not self.enabled:
+            return True
+        expected = self.next_expected(city)
+        return expected is None or now >= expected
+
+
+cadence = CadenceTracker()
@@ -0,0 +1,137 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional
+
+from config import CITIES_BY_REGION, CITY_REGIONS, NORMALIZED_CITIES, normalize_city
+
+CITY_INDEX_PATH = os.getenv(
+    "CITY_INDEX_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "city_index.json")
+)
+
+
+def region_country_code(region: str) -> str:
+    # "🇬🇧 United Kingdom" -> "GB": a flag is two regional-indicator symbols.
+    flag = region.split()[0]
+    return "".join(chr(ord(c) - 0x1F1E6 + ord("A")) for c in flag)
+
+
+@lru_cache(maxsize=None)
+def load_city_index(path: str = CITY_INDEX_PATH) -> Dict[str, Dict[str, Dict]]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+@lru_cache(maxsize=None)
+def _entries_by_city(path: str = CITY_INDEX_PATH) -> Dict[str, List[Dict]]:
+    by_city: Dict[str, List[Dict]] = {}
+    for cities in load_city_index(path).values():
+        for city, entry in cities.items():
+            by_city.setdefault(city, []).append(entry)
+    return by_city
+
+
+def lookup_city(city: str, region: Optional[str] = None, path: str = CITY_INDEX_PATH) -> Optional[Dict]:
+    # The region disambiguates duplicates like "Newcastle" (GB/AU) and "Córdoba" (AR/ES).
+    index = load_city_index(path)
+    if region in index and city in index[region]:
+        return index[region][city]
+    entries = _entries_by_city(path).get(city)
+    return entries[0] if entries else None
+
+
+def resolve_city_ids(cities: Iterable[str], region: Optional[str] = None,
+                     path: str = CITY_INDEX_PATH) -> Dict[str, int]:
+    ids = {}
+    gazetteer = None
+    for city in cities:
+        entry = lookup_city(city, region, path)
+        if entry is not None:
+            ids[city] = entry["id"]
+            continue
+        # Custom cities: a built gazetteer knows their IDs too.
+        if gazetteer is None:
+            from gazetteer import get_gazetteer
+            gazetteer = get_gazetteer()
+        place = gazetteer.resolve(city) if gazetteer.complete else None
+        if place is not None and place.id is not None:
+            ids[city] = place.id
+    return ids
+
+
+
+def city_keys(cities: Iterable[str], region: Optional[str] = None, path: str = CITY_INDEX_PATH,
+              ids: Optional[Dict[str, int]] = None) -> Dict[str, str]:
+    # The place each name stands for in this region. Catalog cities are "<catalog region>|<name>",
+    # so "Newcastle" in GB and in AU never share state, and the key does not change when the city
+    # index is built (history is stored under it). Other names are "id:<city ID>" when the
+    # gazetteer knows them, else "|<name>". A catalog name typed in another case or spacing
+    # gets the catalog city's key.
+    cities = list(cities)
+    custom = [city for city in cities if normalize_city(city) not in NORMALIZED_CITIES]
+    if ids is None:
+        ids = resolve_city_ids(custom, region, path) if custom else {}
+    keys = {}
+    for city in cities:
+        regions = CITY_REGIONS.get(NORMALIZED_CITIES.get(normalize_city(city)), ())
+        if not regions and city in ids:
+            keys[city] = f"id:{ids[city]}"
+            continue
+        home = region if region in regions else (regions[0] if regions else "")
+        keys[city] = f"{home}|{normalize_city(city)}"
+    return keys
+
+
+def build_city_index(api_key: str, base_url: str, path: str = CITY_INDEX_PATH, max_workers: int = 8) -> int:
+    # One-off resolution of every catalog city through "?q=<name>,<country>".
+    import requests
+    from http_client import get_json
+    from weather_api import MAX_RETRIES, REQUEST_TIMEOUT, UNITS
+
+    def resolve(region: str, city: str):
+        params = {"q": f"{city},{region_country_code(region)}", "appid": api_key, "units": UNITS}
+        try:
+            data = get_json(base_url, params, timeout=REQUEST_TIMEOUT, attempts=MAX_RETRIES)
+            return region, city, {
+                "id": data["id"],
+                "country": data.get("sys", {}).get("country", region_country_code(region)),
+                "lat": data["coord"]["lat"],
+                "lon": data["coord"]["lon"],
+            }
+        except (requests.exceptions.RequestException, KeyError, ValueError) as e:
+            print(f"Could not resolve {city} ({region}): {e}")
+            return region, city, None
+
+    pairs = [(region, city) for region, cities in CITIES_BY_REGION.items() for city in cities]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        resolved = list(pool.map(lambda pair: resolve(*pair), pairs))
+
+    index: Dict[str, Dict[str, Dict]] = {}
+    for region, city, entry in resolved:
+        if entry is not None:
+            index.setdefault(region, {})[city] = entry
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=1)
+    load_city_index.cache_clear()
+    _entries_by_city.cache_clear()
+    return sum(len(cities) for cities in index.values())
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Resolve the city catalog to OpenWeather city IDs")
+    parser.add_argument("--base-url", default=os.getenv(
+        "OPENWEATHER_BASE_URL", "https://api.openweathermap.org/data/2.5/weather"))
+    parser.add_argument("--output", default=CITY_INDEX_PATH)
+    args = parser.parse_args()
+
+    count = build_city_index(os.getenv("OPENWEATHER_API_KEY", ""), args.base_url, args.output)
+    print(f"Wrote {count} cities to {args.output}")
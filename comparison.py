@@ -0,0 +1,59 @@
+from typing import Dict, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from forecast import DailySummary
+from observation import Observation, observation_columns
+from utils import TEMP_COLORS, TEMP_THRESHOLDS
+
+TOP_N = 5
+# Columns the summary ranks by, highest first; "coldest" is the low end of temp.
+RANKED_FIELDS = ("temp", "humidity", "wind")
+
+
+class Comparison(NamedTuple):
+    columns: Dict[str, np.ndarray]
+    temp_colors: np.ndarray
+    feels_colors: np.ndarray
+    humidity_alpha: np.ndarray
+    top: Dict[str, np.ndarray]  # field -> row indices, highest first
+    coldest: np.ndarray  # row indices, lowest temp first
+
+
+def _top_rows(values: np.ndarray, n: int) -> np.ndarray:
+    # argpartition is O(rows); only the n winners get sorted.
+    if n >= len(values):
+        return np.argsort(-values, kind="stable")
+    top = np.argpartition(-values, n - 1)[:n]
+    return top[np.argsort(-values[top], kind="stable")]
+
+
+def compare(records: Sequence[Observation], top_n: int = TOP_N,
+            forecast: Optional[DailySummary] = None) -> Comparison:
+    columns = observation_columns(records)
+    if forecast is not None:
+        # Rows of the summary follow records; cities without a forecast are NaN.
+        columns["tomorrow_min"] = forecast.temp_min[:, 1]
+        columns["tomorrow_max"] = forecast.temp_max[:, 1]
+        no_data = np.isnan(forecast.precipitation).all(axis=1)
+        columns["precipitation"] = np.where(no_data, np.nan, np.nansum(forecast.precipitation, axis=1))
+    palette = np.array(TEMP_COLORS, dtype=object)
+    # Same bands as get_temp_color, for every row at once.
+    temp_colors = palette[np.searchsorted(TEMP_THRESHOLDS, columns["temp"], side="right")]
+    feels_colors = palette[np.searchsorted(TEMP_THRESHOLDS, columns["feels_like"], side="right")]
+
+    n = min(top_n, len(records))
+    top = {field: _top_rows(columns[field], n) for field in RANKED_FIELDS}
+    coldest = _top_rows(-columns["temp"], n)
+
+    humidity_alpha = np.clip(columns["humidity"] / 100, 0, 1) * 0.6
+    return Comparison(columns, temp_colors, feels_colors, humidity_alpha, top, coldest)
+
+
+def sort_rows(comparison: Comparison, field: str, descending: bool = False) -> np.ndarray:
+    values = comparison.columns[field]
+    if descending and values.dtype.kind == "f":
+        # Negated rather than reversed, so rows without a value (NaN) stay at the bottom.
+        return np.argsort(-values, kind="stable")
+    order = np.argsort(values, kind="stable")
+    return order[::-1] if descending else order
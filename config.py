@@ -1,3 +1,5 @@
+from types import MappingProxyType
+
 CITIES_BY_REGION = {
     "🇻🇳 Vietnam": [
         "Hanoi", "Ho Chi Minh", "Da Nang", "Hai Phong", "Can Tho", "Nha Trang", "Hue", "Vung Tau"
@@ -169,6 +171,43 @@ CITIES_BY_REGION = {
 ALL_CITIES = [city for cities in CITIES_BY_REGION.values() for city in cities]
 DEFAULT_CITIES = ["Sydney", "Tokyo", "Ho Chi Minh", "New York", "Paris", "London", "Dubai"]
 
+CONTINENT_FLAGS = {
+    "🌏 Asia & Middle East": ('🇻🇳', '🇯🇵', '🇰🇷', '🇨🇳', '🇹🇭', '🇸🇬', '🇲🇾', '🇮🇩', '🇵🇭', '🇮🇳', '🇦🇪', '🇸🇦', '🇹🇷', '🇮🇱'),
+    "🌎 Americas": ('🇺🇸', '🇨🇦', '🇲🇽', '🇧🇷', '🇦🇷', '🇨🇱', '🇨🇴', '🇵🇪'),
+    "🌍 Europe": ('🇬🇧', '🇫🇷', '🇩🇪', '🇮🇹', '🇪🇸', '🇳🇱', '🇧🇪', '🇨🇭', '🇦🇹', '🇵🇱', '🇨🇿', '🇭🇺', '🇷🇺', '🇺🇦', '🇸🇪', '🇳🇴', '🇩🇰', '🇫🇮', '🇮🇪', '🇵🇹', '🇬🇷'),
+    "🌍 Africa": ('🇪🇬', '🇿🇦', '🇳🇬', '🇰🇪', '🇲🇦', '🇹🇳'),
+    "🌏 Oceania": ('🇦🇺', '🇳🇿')
+}
+
+
+def normalize_city(city: str) -> str:
+    return " ".join(city.split()).casefold()
+
+
+#! CATALOG INDEXES
+# Built once at import so sidebar lookups cost the same however large the catalog grows.
+ALL_CITIES_OPTION = "All Cities"
+REGION_OPTIONS = (ALL_CITIES_OPTION,) + tuple(CITIES_BY_REGION)
+REGION_POSITION = MappingProxyType({region: i for i, region in enumerate(REGION_OPTIONS)})
+# Region keys start with their flag emoji.
+COUNTRIES_BY_CONTINENT = MappingProxyType({
+    continent: tuple(region for region in CITIES_BY_REGION if region.split(" ", 1)[0] in flags)
+    for continent, flags in CONTINENT_FLAGS.items()
+})
+_city_regions = {}
+for _region, _cities in CITIES_BY_REGION.items():
+    for _city in _cities:
+        _city_regions.setdefault(_city, []).append(_region)
+# Names such as "Córdoba" and "Newcastle" belong to more than one region.
+CITY_REGIONS = MappingProxyType({city: tuple(regions) for city, regions in _city_regions.items()})
+UNIQUE_CITIES = tuple(CITY_REGIONS)
+# "  new york" -> "New York": typed spellings of a catalog name map to the catalog entry.
+NORMALIZED_CITIES = MappingProxyType({normalize_city(city): city for city in CITY_REGIONS})
+del _city_regions, _region, _cities, _city
+
+MAX_HISTORY_RECORDS = 200
+HISTORY_FIELDS = ("temp", "feels_like", "humidity", "pressure", "wind")
+
 REFRESH_OPTIONS = {
     "30 seconds": 30,
     "1 minute": 60,
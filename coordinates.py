@@ -0,0 +1,93 @@
+import json
+import math
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import ALL_CITIES_OPTION, CITIES_BY_REGION, CITY_REGIONS
+
+COORDINATES_PATH = os.getenv(
+    "COORDINATES_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "city_coordinates.json")
+)
+
+
+@lru_cache(maxsize=None)
+def load_coordinates(path: str = COORDINATES_PATH) -> Tuple[np.ndarray, np.ndarray, Dict[Tuple[str, str], int]]:
+    # Flat lat/lon arrays for the whole catalog plus a (region, city) -> row map, read once per process.
+    try:
+        with open(path, encoding="utf-8") as f:
+            table = json.load(f)
+    except FileNotFoundError:
+        table = {}
+    rows = {}
+    points = []
+    for region, cities in table.items():
+        for city, (lat, lon) in cities.items():
+            rows[(region, city)] = len(points)
+            points.append((lat, lon))
+    coords = np.array(points, dtype=np.float32).reshape(-1, 2)
+    return coords[:, 0], coords[:, 1], rows
+
+
+def _fallback(city: str, region: Optional[str]) -> Tuple[float, float]:
+    # Custom cities: the city index or a built gazetteer may know where they are.
+    from city_index import lookup_city
+    from gazetteer import get_gazetteer
+
+    entry = lookup_city(city, region)
+    if entry is not None and "lat" in entry:
+        return entry["lat"], entry["lon"]
+    gazetteer = get_gazetteer()
+    place = gazetteer.resolve(city) if gazetteer.complete else None
+    if place is not None and math.isfinite(place.lat) and math.isfinite(place.lon):
+        return place.lat, place.lon
+    return math.nan, math.nan
+
+
+def coordinates_for(cities: List[str], region: Optional[str] = None,
+                    path: str = COORDINATES_PATH) -> Tuple[np.ndarray, np.ndarray]:
+    # Aligned with cities; NaN where a city cannot be placed.
+    lat, lon, rows = load_coordinates(path)
+    out = np.full((2, len(cities)), np.nan, dtype=np.float32)
+    for i, city in enumerate(cities):
+        # "All Cities" and custom entries: first catalog region that lists the city.
+        regions = (region,) if region and region != ALL_CITIES_OPTION else ()
+        row = next((rows[(r, city)] for r in regions + CITY_REGIONS.get(city, ()) if (r, city) in rows), None)
+        if row is not None:
+            out[:, i] = lat[row], lon[row]
+        else:
+            out[:, i] = _fallback(city, region)
+    return out[0], out[1]
+
+
+def build_coordinates(path: str = COORDINATES_PATH) -> int:
+    # Regenerates the table from the city index, whose entries carry the API's own coordinates.
+    from city_index import lookup_city
+
+    table: Dict[str, Dict[str, List[float]]] = {}
+    for region, cities in CITIES_BY_REGION.items():
+        for city in cities:
+            entry = lookup_city(city, region)
+            if entry is not None and "lat" in entry:
+                table.setdefault(region, {})[city] = [round(entry["lat"], 2), round(entry["lon"], 2)]
+    if not table:
+        # No city index to build from: keep the shipped table rather than emptying it.
+        return 0
+
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(table, f, ensure_ascii=False, indent=1)
+    load_coordinates.cache_clear()
+    return sum(len(cities) for cities in table.values())
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rebuild the catalog coordinate table from the city index")
+    parser.add_argument("--output", default=COORDINATES_PATH)
+    args = parser.parse_args()
+
+    count = build_coordinates(args.output)
+    print(f"Wrote {count} cities to {args.output}")
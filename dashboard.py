@@ -0,0 +1,131 @@
+import time
+from contextlib import nullcontext
+from typing import Dict, List, Optional, Tuple
+
+import streamlit as st
+
+from city_index import city_keys
+from forecast import daily_summary
+from ingestion import get_scheduler
+from metrics import metrics
+from state_backend import get_state_backend
+from ui_components import (
+    GRID_THRESHOLD, render_weather_card, render_weather_grid, render_weather_map, render_comparison_table,
+    render_history_chart
+)
+from utils import report_fetch_error
+from weather_api import FetchResult, fetch_weather_many
+
+PENDING_REFRESH_SECONDS = 2
+
+
+def load_weather(cities: List[str], region: Optional[str], max_age: float, api_key: Optional[str],
+                 base_url: str, background_polling: bool,
+                 stale_while_revalidate: bool
+                 ) -> Tuple[List[FetchResult], Dict[str, float], Dict[str, float], List[str]]:
+    ages = {}
+    deltas = {}
+    pending = []
+    if background_polling:
+        # The poller keeps watched cities fresh; reruns read its latest snapshot. With
+        # stale-while-revalidate it is rendered however old, and expired or unseen cities
+        # are refreshed in the background for a later tick to pick up.
+        now = time.monotonic()
+        with st.spinner("Fetching weather data...") if not stale_while_revalidate else nullcontext():
+            entries = get_scheduler(api_key, base_url).entries(
+                st.session_state.session_id, cities, region, max_age, block=not stale_while_revalidate)
+        results = []
+        for city, entry in zip(cities, entries):
+            if entry is None:
+                pending.append(city)
+                continue
+            results.append(entry.result)
+            if stale_while_revalidate:
+                ages[city] = now - entry.fetched_at
+            if entry.result.record is not None and entry.previous_temp is not None:
+                deltas[city] = entry.result.record.temp - entry.previous_temp
+        return results, ages, deltas, pending
+
+    with st.spinner("Fetching weather data..."):
+        results = fetch_weather_many(cities, api_key, base_url, max_age=max_age, region=region)
+    # Deltas come from the shared state, so every session and replica shows the same change.
+    keys = city_keys(cities, region)
+    shared = get_state_backend().publish({keys[r.city]: r.record for r in results if r.record is not None},
+                                         time.time())
+    for city, key in keys.items():
+        entry = shared.get(key)
+        if entry is not None and entry.previous_temp is not None:
+            deltas[city] = entry.record.temp - entry.previous_temp
+    return results, ages, deltas, pending
+
+
+def refresh_interval(max_age: float) -> float:
+    # Poll quickly while some selected cities are still waiting for their first observation.
+    return PENDING_REFRESH_SECONDS if st.session_state.get("pending_cities") else max_age
+
+
+@metrics.timed("weather_phase_seconds", phase="fragment")
+def render_dashboard(cities: List[str], region: Optional[str], max_age: float, show_metrics: bool,
+                     show_comparison: bool, show_history: bool, api_key: Optional[str], base_url: str,
+                     background_polling: bool = True, stale_while_revalidate: bool = True,
+                     show_forecast: bool = False, show_map: bool = False):
+    # The refresh-scoped region of the page: app.py runs this as a fragment on its own timer.
+    results, ages, deltas, pending = load_weather(cities, region, max_age, api_key, base_url,
+                                          background_polling, stale_while_revalidate)
+
+    if bool(pending) != bool(st.session_state.get("pending_cities")):
+        # The fragment timer is fixed per full run, so switching between the fast pending
+        # interval and the normal one needs one full rerun.
+        st.session_state.pending_cities = pending
+        st.rerun()
+    st.session_state.pending_cities = pending
+
+    current_data = []
+    reported = set()
+    for result in results:
+        if result.record:
+            current_data.append(result.record)
+        if result.error and result.error not in reported:
+            reported.add(result.error)
+            report_fetch_error(result)
+
+    if pending:
+        st.info(f"⏳ Loading {len(pending)} cit{'y' if len(pending) == 1 else 'ies'}: {', '.join(pending)}")
+
+    if not current_data:
+        if not pending:
+            st.warning("No data available. Please check your API key or city selection.")
+        return
+
+    # Whatever is cached, never a fetch: the poller loads missing forecasts within the shared call
+    # budget, polling on or off. The daily summary is one array pass over every selected city,
+    # its rows following current_data.
+    forecast = None
+    if show_forecast:
+        forecast = daily_summary(get_scheduler(api_key, base_url).forecasts(
+            st.session_state.session_id, [record.city for record in current_data], region))
+
+    #! WEATHER DISPLAY
+    st.markdown("<h2 class='wx-section wx-first'>📍 Current Weather</h2>", unsafe_allow_html=True)
+
+    if show_map:
+        render_weather_map(current_data, region)
+    elif len(current_data) > GRID_THRESHOLD:
+        render_weather_grid(current_data, show_metrics, ages=ages, max_age=max_age, deltas=deltas,
+                            forecast=forecast)
+    else:
+        num_cols = min(4, max(1, len(current_data)))
+        cols = st.columns(num_cols, gap="medium")
+
+        for idx, record in enumerate(current_data):
+            with cols[idx % len(cols)]:
+                render_weather_card(record, show_metrics, age=ages.get(record.city), max_age=max_age,
+                                    delta=deltas.get(record.city), forecast=forecast, forecast_row=idx)
+
+    #! COMPARISON TABLE
+    if show_comparison and len(current_data) > 1:
+        render_comparison_table(current_data, forecast)
+
+    #! HISTORY CHART
+    if show_history:
+        render_history_chart([record.city for record in current_data], region)
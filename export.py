@@ -0,0 +1,116 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from typing import Iterable, Iterator, Optional, TextIO, Tuple
+
+from dotenv import load_dotenv
+
+from city_index import region_country_code
+from config import ALL_CITIES_OPTION, CITIES_BY_REGION, REGION_POSITION
+from observation import Observation
+from weather_api import MAX_CONCURRENT_REQUESTS, FetchResult, stream_weather
+
+CSV_FIELDS = ("region",) + Observation._fields + ("error",)
+# "--region GB" is the same as "--region '🇬🇧 United Kingdom'".
+REGION_CODES = {region_country_code(region): region for region in CITIES_BY_REGION}
+
+
+def region_cities(region: str) -> Iterator[Tuple[str, Optional[str]]]:
+    # "All Cities" walks every region so names shared by two regions resolve to the right one.
+    regions = CITIES_BY_REGION if region == ALL_CITIES_OPTION else (region,)
+    for name in regions:
+        for city in CITIES_BY_REGION[name]:
+            yield city, name
+
+
+def file_cities(f: TextIO) -> Iterator[Tuple[str, Optional[str]]]:
+    # One city per line; blank lines and "#" comments are skipped.
+    for line in f:
+        city = line.strip()
+        if city and not city.startswith("#"):
+            yield city, None
+
+
+def region_arg(value: str) -> str:
+    if value in REGION_POSITION:
+        return value
+    if value.upper() in REGION_CODES:
+        return REGION_CODES[value.upper()]
+    raise argparse.ArgumentTypeError(f"unknown region {value!r}; use a catalog region, its country code "
+                                     f"({', '.join(sorted(REGION_CODES))}) or '{ALL_CITIES_OPTION}'")
+
+
+def _row(region: Optional[str], result: FetchResult) -> dict:
+    # The region keeps same-named places apart: "All Cities" has two Newcastles and two Córdobas.
+    if result.record is not None:
+        return {"region": region, **result.record._asdict()}
+    return {"region": region, "city": result.city, "error": result.error}
+
+
+def write_ndjson(results: Iterable[Tuple[Optional[str], FetchResult]], out: TextIO) -> int:
+    count = 0
+    for region, result in results:
+        out.write(json.dumps(_row(region, result), ensure_ascii=False) + "\n")
+        out.flush()
+        count += 1
+    return count
+
+
+def write_csv(results: Iterable[Tuple[Optional[str], FetchResult]], out: TextIO) -> int:
+    writer = csv.DictWriter(out, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    count = 0
+    for region, result in results:
+        writer.writerow(_row(region, result))
+        out.flush()
+        count += 1
+    return count
+
+
+WRITERS = {"ndjson": write_ndjson, "csv": write_csv}
+
+
+def main(argv=None) -> int:
+    load_dotenv()
+    parser = argparse.ArgumentParser(
+        description="Export current weather for catalog or listed cities without the dashboard")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--region", type=region_arg, help="a catalog region, its country code (e.g. GB) "
+                        f"or '{ALL_CITIES_OPTION}'")
+    source.add_argument("--cities-file", help="one city per line, or - for stdin")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="ndjson")
+    parser.add_argument("--workers", type=int, default=MAX_CONCURRENT_REQUESTS)
+    parser.add_argument("--base-url", default=os.getenv(
+        "OPENWEATHER_BASE_URL", "https://api.openweathermap.org/data/2.5/weather"))
+    args = parser.parse_args(argv)
+
+    if args.region:
+        pairs = region_cities(args.region)
+        f = None
+    else:
+        f = sys.stdin if args.cities_file == "-" else open(args.cities_file, encoding="utf-8")
+        pairs = file_cities(f)
+
+    # Rows are written as each /group batch or single lookup completes, never buffered.
+    results = stream_weather(pairs, os.getenv("OPENWEATHER_API_KEY"), args.base_url, args.workers)
+    failed = 0
+
+    def counted(results):
+        nonlocal failed
+        for region, result in results:
+            failed += result.record is None
+            yield region, result
+
+    try:
+        count = WRITERS[args.format](counted(results), sys.stdout)
+    finally:
+        if f is not None and f is not sys.stdin:
+            f.close()
+    print(f"Exported {count - failed} cities, {failed} failed", file=sys.stderr)
+    return 1 if count and failed == count else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+import requests
+
+from city_index import resolve_city_ids
+from config import normalize_city
+from http_client import get_json
+from metrics import metrics
+from weather_api import MAX_CONCURRENT_REQUESTS, MAX_RETRIES, REQUEST_TIMEOUT, UNITS, validate_api_key
+from weather_cache import WeatherCache
+
+# OpenWeather recomputes the 5-day/3-hour forecast every 3 hours; within one cycle a
+# refetch returns the same data, so each city costs one call per cycle at most.
+FORECAST_CYCLE = 3 * 3600
+FORECAST_STEPS = 40
+FORECAST_DAYS = 5
+# A city whose forecast failed is retried after this rather than on every tick.
+FORECAST_RETRY = 600
+
+# Keys carry the cycle number, so a new cycle is a miss; the previous one is kept as fallback.
+forecast_cache = WeatherCache(ttl=FORECAST_CYCLE, max_age=2 * FORECAST_CYCLE)
+failed_forecasts = WeatherCache(ttl=FORECAST_RETRY, max_age=FORECAST_RETRY)
+
+
+class Forecast(NamedTuple):
+    # One row per 3-hour step, padded with NaN to FORECAST_STEPS so cities stack into one array.
+    cycle: int
+    timezone: int  # seconds east of UTC
+    times: np.ndarray
+    temp: np.ndarray
+    precipitation: np.ndarray  # rain + snow over the step, mm
+    pop: np.ndarray  # probability of precipitation, 0-1
+
+
+class DailySummary(NamedTuple):
+    # (cities, FORECAST_DAYS) arrays, column 0 being each city's local today; NaN without data.
+    first_day: np.ndarray  # (cities,) local day number of column 0, days since the epoch
+    temp_min: np.ndarray
+    temp_max: np.ndarray
+    temp_mean: np.ndarray
+    precipitation: np.ndarray
+    pop: np.ndarray
+
+
+def current_cycle(now: Optional[float] = None) -> int:
+    return int((time.time() if now is None else now) // FORECAST_CYCLE)
+
+
+def forecast_url_for(base_url: str) -> str:
+    return base_url.rsplit("/", 1)[0] + "/forecast"
+
+
+def _padded(values: List[float]) -> np.ndarray:
+    row = np.full(FORECAST_STEPS, np.nan)
+    row[:min(len(values), FORECAST_STEPS)] = values[:FORECAST_STEPS]
+    return row
+
+
+def _parse_forecast(data: Dict, cycle: int) -> Forecast:
+    steps = data["list"]
+    return Forecast(
+        cycle,
+        int(data.get("city", {}).get("timezone", 0)),
+        _padded([step["dt"] for step in steps]),
+        _padded([step["main"]["temp"] for step in steps]),
+        _padded([step.get("rain", {}).get("3h", 0) + step.get("snow", {}).get("3h", 0) for step in steps]),
+        _padded([step.get("pop", 0) for step in steps]),
+    )
+
+
+def request_forecast(city: str, city_id: Optional[int], api_key: Optional[str], base_url: str,
+                     cycle: int) -> Optional[Forecast]:
+    params = {"id": city_id} if city_id is not None else {"q": city.strip()}
+    params.update(appid=api_key, units=UNITS)
+    try:
+        with metrics.timer("weather_phase_seconds", phase="forecast_request"):
+            data = get_json(forecast_url_for(base_url), params, timeout=REQUEST_TIMEOUT, attempts=MAX_RETRIES)
+        return _parse_forecast(data, cycle)
+    except (requests.exceptions.RequestException, ValueError, KeyError, TypeError) as e:
+        # Counted, not logged: the city is retried after FORECAST_RETRY and the card just has no strip.
+        metrics.inc("weather_forecast_errors_total", error=type(e).__name__)
+        return None
+
+
+def _cache_keys(cities: List[str], city_ids: Dict[str, int]) -> Dict[str, tuple]:
+    return {city: ("forecast", city_ids.get(city) or normalize_city(city), UNITS) for city in cities}
+
+
+def cached_forecasts(cities: List[str], region: Optional[str] = None) -> List[Optional[Forecast]]:
+    # What rendering uses: aligned with cities, this cycle's forecast or else the last one, and
+    # never a network call. The poller fills the cache (IngestionScheduler.forecasts).
+    cycle = current_cycle()
+    keys = _cache_keys(cities, resolve_city_ids(cities, region))
+    return [forecast_cache.get(keys[city] + (cycle,))
+            or forecast_cache.get(keys[city] + (cycle - 1,), forecast_cache.max_age) for city in cities]
+
+
+def missing_forecasts(cities: List[str], region: Optional[str] = None) -> List[str]:
+    # Cities that would cost a call now: nothing cached for this cycle and no recent failure.
+    cycle = current_cycle()
+    keys = _cache_keys(cities, resolve_city_ids(cities, region))
+    return [city for city in dict.fromkeys(cities)
+            if forecast_cache.get(keys[city] + (cycle,)) is None and failed_forecasts.get(keys[city]) is None]
+
+
+@metrics.timed("weather_phase_seconds", phase="forecast")
+def fetch_forecasts(cities: List[str], api_key: Optional[str], base_url: str,
+                    region: Optional[str] = None,
+                    max_workers: int = MAX_CONCURRENT_REQUESTS) -> List[Optional[Forecast]]:
+    # Aligned with cities; None where no forecast is available. Between cycles every city is a
+    # cache hit and nothing goes over the network.
+    if not cities or not validate_api_key(api_key):
+        return [None] * len(cities)
+
+    cycle = current_cycle()
+    city_ids = resolve_city_ids(cities, region)
+    keys = _cache_keys(cities, city_ids)
+    forecasts: Dict[str, Optional[Forecast]] = {}
+    missing = []
+    for city in dict.fromkeys(cities):
+        cached = forecast_cache.get(keys[city] + (cycle,))
+        if cached is not None:
+            forecasts[city] = cached
+        elif failed_forecasts.get(keys[city]) is None:
+            missing.append(city)
+        else:
+            forecasts[city] = forecast_cache.get(keys[city] + (cycle - 1,), forecast_cache.max_age)
+
+    def fetch(city: str) -> Optional[Forecast]:
+        return forecast_cache.get_or_fetch(
+            keys[city] + (cycle,),
+            lambda: request_forecast(city, city_ids.get(city), api_key, base_url, cycle),
+            cacheable=lambda forecast: forecast is not None,
+        )
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(missing)),
+                                thread_name_prefix="weather-forecast") as pool:
+            for city, forecast in zip(missing, pool.map(fetch, missing)):
+                if forecast is None:
+                    failed_forecasts.put(keys[city], True)
+                    # Last cycle's forecast is still closer to the truth than nothing.
+                    forecast = forecast_cache.get(keys[city] + (cycle - 1,), forecast_cache.max_age)
+                forecasts[city] = forecast
+    return [forecasts[city] for city in cities]
+
+
+_EMPTY_ROW = np.full(FORECAST_STEPS, np.nan)
+
+
+def _stack(forecasts: Sequence[Optional[Forecast]], field: str) -> np.ndarray:
+    rows = [getattr(f, field) if f is not None else _EMPTY_ROW for f in forecasts]
+    return np.stack(rows) if rows else np.empty((0, FORECAST_STEPS))
+
+
+def daily_summary(forecasts: Sequence[Optional[Forecast]], now: Optional[float] = None) -> DailySummary:
+    # One pass over a (cities, steps) array: each step gets a flat (city, local day) bucket
+    # and bincount / ufunc.at aggregate every bucket at once.
+    now = time.time() if now is None else now
+    n = len(forecasts)
+    times, temp, precipitation, pop = (_stack(forecasts, field) for field in ("times", "temp", "precipitation", "pop"))
+    timezone = np.array([f.timezone if f is not None else 0 for f in forecasts], dtype=float)
+
+    first_day = np.floor((now + timezone) / 86400)
+    with np.errstate(invalid="ignore"):
+        day = np.floor((times + timezone[:, None]) / 86400) - first_day[:, None]
+        valid = (day >= 0) & (day < FORECAST_DAYS) & ~np.isnan(temp)
+    bucket = (np.arange(n)[:, None] * FORECAST_DAYS + np.where(valid, day, 0)).astype(np.intp)[valid]
+    size = n * FORECAST_DAYS
+
+    count = np.bincount(bucket, minlength=size)
+    total = np.bincount(bucket, weights=temp[valid], minlength=size)
+    rain = np.bincount(bucket, weights=precipitation[valid], minlength=size)
+    low = np.full(size, np.inf)
+    high = np.full(size, -np.inf)
+    chance = np.zeros(size)
+    np.minimum.at(low, bucket, temp[valid])
+    np.maximum.at(high, bucket, temp[valid])
+    np.maximum.at(chance, bucket, pop[valid])
+
+    empty = count == 0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+    shape = (n, FORECAST_DAYS)
+    return DailySummary(
+        first_day,
+        np.where(empty, np.nan, low).reshape(shape),
+        np.where(empty, np.nan, high).reshape(shape),
+        np.where(empty, np.nan, mean).reshape(shape),
+        np.where(empty, np.nan, rain).reshape(shape),
+        np.where(empty, np.nan, chance).reshape(shape),
+    )
@@ -0,0 +1,219 @@
+import difflib
+import gzip
+import json
+import os
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from config import CITIES_BY_REGION, CITY_REGIONS
+
+GAZETTEER_PATH = os.getenv(
+    "GAZETTEER_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "gazetteer_data")
+)
+SUGGESTION_LIMIT = 8
+# Fuzzy matching scores only the candidates sharing the most trigrams with the query.
+FUZZY_CANDIDATES = 50
+FUZZY_CUTOFF = 0.6
+
+# Every array is a flat .npy file, so a built gazetteer opens memory-mapped in milliseconds.
+_ARRAYS = ("keys", "names", "countries", "ids", "lat", "lon", "gram_keys", "gram_offsets", "postings")
+
+
+class Place(NamedTuple):
+    name: str
+    country: str
+    id: Optional[int]
+    lat: float
+    lon: float
+
+    @property
+    def label(self) -> str:
+        # Unambiguous catalog names stay as they are; anything else carries its country so
+        # "?q=" and the gazetteer both resolve it to the same place.
+        if len(CITY_REGIONS.get(self.name, ())) == 1 or not self.country:
+            return self.name
+        return f"{self.name}, {self.country}"
+
+
+def search_key(name: str) -> str:
+    # "  São  Paulo" -> "sao paulo": accents and case never decide a match.
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.split()).casefold()
+
+
+def _trigrams(key: str) -> set:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _split_country(text: str) -> Tuple[str, str]:
+    # "Newcastle, AU" -> ("newcastle", "AU")
+    name, _, country = text.rpartition(",")
+    if name and len(country.strip()) == 2 and country.strip().isalpha():
+        return search_key(name), country.strip().upper()
+    return search_key(text), ""
+
+
+def _build_arrays(places: Iterable[Place]) -> Dict[str, np.ndarray]:
+    rows = sorted(((search_key(p.name), p) for p in places if p.name.strip()), key=lambda row: row[0])
+    keys = [key for key, _ in rows]
+
+    postings_by_gram: Dict[str, List[int]] = {}
+    for row, key in enumerate(keys):
+        for gram in _trigrams(key):
+            postings_by_gram.setdefault(gram, []).append(row)
+    gram_keys = sorted(postings_by_gram)
+    lengths = [len(postings_by_gram[gram]) for gram in gram_keys]
+
+    return {
+        "keys": np.array([k.encode("utf-8") for k in keys], dtype=bytes),
+        "names": np.array([p.name.encode("utf-8") for _, p in rows], dtype=bytes),
+        "countries": np.array([p.country.encode("ascii") for _, p in rows], dtype="S2"),
+        "ids": np.array([-1 if p.id is None else p.id for _, p in rows], dtype=np.int64),
+        "lat": np.array([p.lat for _, p in rows], dtype=np.float32),
+        "lon": np.array([p.lon for _, p in rows], dtype=np.float32),
+        "gram_keys": np.array([g.encode("utf-8") for g in gram_keys], dtype=bytes),
+        "gram_offsets": np.concatenate(([0], np.cumsum(lengths))).astype(np.int64),
+        "postings": np.fromiter((row for g in gram_keys for row in postings_by_gram[g]),
+                                dtype=np.int32, count=sum(lengths)),
+    }
+
+
+class Gazetteer:
+    def __init__(self, arrays: Dict[str, np.ndarray], complete: bool):
+        # complete: built from a full city list, so a name it doesn't know is not a city.
+        self.complete = complete
+        self._a = arrays
+
+    def __len__(self) -> int:
+        return len(self._a["keys"])
+
+    def _place(self, row: int) -> Place:
+        a = self._a
+        city_id = int(a["ids"][row])
+        return Place(a["names"][row].decode("utf-8"), a["countries"][row].decode("ascii"),
+                     None if city_id < 0 else city_id, float(a["lat"][row]), float(a["lon"][row]))
+
+    def _key_range(self, key: bytes, prefix: bool) -> Tuple[int, int]:
+        keys = self._a["keys"]
+        start = int(np.searchsorted(keys, key, side="left"))
+        end = int(np.searchsorted(keys, key + b"\xff" if prefix else key, side="right"))
+        return start, end
+
+    def prefix(self, query: str, limit: int = SUGGESTION_LIMIT) -> List[Place]:
+        key = search_key(query)
+        if not key:
+            return []
+        start, end = self._key_range(key.encode("utf-8"), prefix=True)
+        return [self._place(row) for row in range(start, min(end, start + limit))]
+
+    def fuzzy(self, query: str, limit: int = SUGGESTION_LIMIT) -> List[Place]:
+        key = search_key(query)
+        if not key:
+            return []
+        a = self._a
+        gram_keys = a["gram_keys"]
+        hits = []
+        for gram in _trigrams(key):
+            gram = gram.encode("utf-8")
+            i = int(np.searchsorted(gram_keys, gram))
+            if i < len(gram_keys) and gram_keys[i] == gram:
+                hits.append(a["postings"][a["gram_offsets"][i]:a["gram_offsets"][i + 1]])
+        if not hits:
+            return []
+        rows, counts = np.unique(np.concatenate(hits), return_counts=True)
+        if len(rows) > FUZZY_CANDIDATES:
+            best = np.argpartition(-counts, FUZZY_CANDIDATES - 1)[:FUZZY_CANDIDATES]
+            rows = rows[best]
+        scored = []
+        for row in rows:
+            score = difflib.SequenceMatcher(None, key, a["keys"][row].decode("utf-8")).ratio()
+            if score >= FUZZY_CUTOFF:
+                scored.append((-score, int(row)))
+        scored.sort()
+        return [self._place(row) for _, row in scored[:limit]]
+
+    def suggest(self, query: str, limit: int = SUGGESTION_LIMIT) -> List[Place]:
+        # Prefix matches first (typing in progress), then near misses (typos).
+        places = self.prefix(query, limit)
+        if len(places) < limit:
+            seen = {(p.name, p.country) for p in places}
+            places += [p for p in self.fuzzy(query, limit) if (p.name, p.country) not in seen][:limit - len(places)]
+        return places
+
+    def resolve(self, text: str) -> Optional[Place]:
+        # Exact match on the name, narrowed by a ", CC" suffix when one is given.
+        key, country = _split_country(text)
+        if not key:
+            return None
+        start, end = self._key_range(key.encode("utf-8"), prefix=False)
+        for row in range(start, end):
+            if not country or self._a["countries"][row].decode("ascii") == country:
+                return self._place(row)
+        return None
+
+
+def build_gazetteer(source: str, path: str = GAZETTEER_PATH) -> int:
+    # source: OpenWeather's bulk city list (city.list.json or city.list.json.gz).
+    opener = gzip.open if source.endswith(".gz") else open
+    with opener(source, "rt", encoding="utf-8") as f:
+        cities = json.load(f)
+    places = (Place(c["name"], c.get("country", ""), c["id"], c["coord"]["lat"], c["coord"]["lon"])
+              for c in cities)
+    arrays = _build_arrays(places)
+    os.makedirs(path, exist_ok=True)
+    for name in _ARRAYS:
+        np.save(os.path.join(path, f"{name}.npy"), arrays[name])
+    return len(arrays["keys"])
+
+
+def load_gazetteer(path: str = GAZETTEER_PATH) -> Optional[Gazetteer]:
+    try:
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in _ARRAYS}
+    except FileNotFoundError:
+        return None
+    return Gazetteer(arrays, complete=True)
+
+
+def catalog_gazetteer() -> Gazetteer:
+    # Without a built gazetteer, the dashboard's own catalog (plus any IDs in the city index)
+    # still gives offline suggestions; it cannot rule other names out.
+    from city_index import lookup_city, region_country_code
+
+    places = []
+    for region, cities in CITIES_BY_REGION.items():
+        for city in cities:
+            entry = lookup_city(city, region) or {}
+            places.append(Place(city, region_country_code(region), entry.get("id"),
+                                entry.get("lat", np.nan), entry.get("lon", np.nan)))
+    return Gazetteer(_build_arrays(places), complete=False)
+
+
+_gazetteer: Optional[Gazetteer] = None
+_gazetteer_lock = threading.Lock()
+
+
+def get_gazetteer() -> Gazetteer:
+    # Loaded on first use, not at import, so it never adds to app start-up.
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                _gazetteer = load_gazetteer() or catalog_gazetteer()
+    return _gazetteer
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the offline city gazetteer from OpenWeather's city list")
+    parser.add_argument("source", help="city.list.json.gz from https://bulk.openweathermap.org/sample/")
+    parser.add_argument("--output", default=GAZETTEER_PATH)
+    args = parser.parse_args()
+
+    count = build_gazetteer(args.source, args.output)
+    print(f"Wrote {count} places to {args.output}")
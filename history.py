@@ -0,0 +1,129 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+from config import HISTORY_FIELDS, MAX_HISTORY_RECORDS
+from history_db import HISTORY_DB_PATH, HistoryDB, get_history_db
+from observation import Observation
+
+HISTORY_MAX_CITIES = 1000
+# Column 0 holds the epoch timestamp, the rest follow HISTORY_FIELDS.
+_COLUMNS = ("timestamp",) + HISTORY_FIELDS
+
+
+def history_memory_bytes(n_cities: int, capacity: int = MAX_HISTORY_RECORDS) -> int:
+    # Every value is stored twice (see CityHistory), as float64.
+    return n_cities * len(_COLUMNS) * 2 * capacity * 8
+
+
+class CityHistory:
+    # Each value is written at i and i + capacity, so the latest n rows are always one
+    # contiguous slice and window() can hand out views instead of copies.
+    def __init__(self, capacity: int = MAX_HISTORY_RECORDS):
+        self.capacity = capacity
+        self._data = np.full((len(_COLUMNS), 2 * capacity), np.nan)
+        self._next = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def last_timestamp(self) -> Optional[float]:
+        if not self._size:
+            return None
+        return float(self._data[0, (self._next - 1) % self.capacity])
+
+    def append(self, timestamp: float, values: Tuple[float, ...]):
+        row = (timestamp,) + tuple(values)
+        self._data[:, self._next] = row
+        self._data[:, self._next + self.capacity] = row
+        self._next = (self._next + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def window(self, n: Optional[int] = None) -> Dict[str, np.ndarray]:
+        n = self._size if n is None else min(n, self._size)
+        end = self._next + self.capacity
+        view = self._data[:, end - n:end]
+        view.flags.writeable = False
+        return dict(zip(_COLUMNS, view))
+
+
+class HistoryStore:
+    # Keyed by city_index.city_keys identity, like the rest of the pipeline: same-named cities in
+    # different countries get separate series, in memory and on disk.
+    def __init__(self, capacity: int = MAX_HISTORY_RECORDS, max_cities: int = HISTORY_MAX_CITIES,
+                 db: Optional[HistoryDB] = None):
+        self.capacity = capacity
+        self.max_cities = max_cities
+        self.db = db
+        self._cities: "OrderedDict[str, CityHistory]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _history(self, key: str, create: bool) -> Optional[CityHistory]:
+        history = self._cities.get(key)
+        if history is None:
+            # First touch after a restart: refill the ring from the newest rows on disk.
+            rows = self.db.tail(key, self.capacity) if self.db is not None else []
+            if not rows and not create:
+                return None
+            history = self._cities[key] = CityHistory(self.capacity)
+            for timestamp, *values in rows:
+                history.append(timestamp, values)
+            if len(self._cities) > self.max_cities:
+                self._cities.popitem(last=False)
+        self._cities.move_to_end(key)
+        return history
+
+    def append(self, key: str, record: Observation) -> bool:
+        # Key points by the provider's observation time when known, so a repeated
+        # observation fetched again later is not stored twice.
+        timestamp = record.observed_at or record.timestamp
+        values = tuple(float(getattr(record, f)) for f in HISTORY_FIELDS)
+        with self._lock:
+            history = self._history(key, create=True)
+            # Re-reading a cached or snapshot record must not add a duplicate point.
+            if history.last_timestamp is not None and timestamp <= history.last_timestamp:
+                return False
+            history.append(timestamp, values)
+        if self.db is not None:
+            self.db.submit(key, timestamp, values)
+        return True
+
+    def attach_db(self, db: Optional[HistoryDB]):
+        # Cities already in memory keep their rings; new ones are refilled from db from now on.
+        with self._lock:
+            if self.db is None:
+                self.db = db
+
+    def record_many(self, records: Mapping[str, Observation]):
+        # records: key -> observation.
+        for key, record in records.items():
+            self.append(key, record)
+
+    def window(self, key: str, n: Optional[int] = None) -> Optional[Dict[str, np.ndarray]]:
+        with self._lock:
+            history = self._history(key, create=False)
+            return None if history is None else history.window(n)
+
+    def load_range(self, key: str, start: float, end: float,
+                   resolution: str = "raw") -> Optional[Dict[str, np.ndarray]]:
+        if self.db is None:
+            return None
+        return self.db.load_range(key, start, end, resolution)
+
+    def nbytes(self) -> int:
+        with self._lock:
+            return sum(history._data.nbytes for history in self._cities.values())
+
+
+# In memory only until enable_history_db(): importing the fetch core (export CLI, benchmarks)
+# must not open or write the on-disk history.
+weather_history = HistoryStore()
+
+
+def enable_history_db(path: str = HISTORY_DB_PATH):
+    # Called by app.py; a no-op once attached, or when WEATHER_HISTORY_DB is set empty.
+    weather_history.attach_db(get_history_db(path))
@@ -0,0 +1,191 @@
+import atexit
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import HISTORY_FIELDS
+from metrics import metrics
+
+HISTORY_DB_PATH = os.getenv(
+    "WEATHER_HISTORY_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "weather_history.db")
+)
+FLUSH_INTERVAL = 5.0
+FLUSH_BATCH_SIZE = 500
+# Rows waiting while the file cannot be written (locked by another replica, disk full). Past
+# this the oldest are dropped and counted, so a stuck writer cannot grow memory without bound.
+MAX_PENDING_ROWS = 100_000
+# Rollup tables keep count/sum/min/max per bucket so they can be extended one batch at a time.
+ROLLUPS = {"1h": 3600, "1d": 86400}
+# 1: the city column holds city_index.city_keys identities instead of bare names.
+SCHEMA_VERSION = 1
+
+_AGGREGATES = [f"{f}_{agg}" for f in HISTORY_FIELDS for agg in ("sum", "min", "max")]
+
+
+def _schema() -> List[str]:
+    fields = ", ".join(f"{f} REAL" for f in HISTORY_FIELDS)
+    statements = [
+        f"CREATE TABLE IF NOT EXISTS observations (city TEXT NOT NULL, ts REAL NOT NULL, {fields}, "
+        "PRIMARY KEY (city, ts)) WITHOUT ROWID",
+    ]
+    aggregates = ", ".join(f"{a} REAL" for a in _AGGREGATES)
+    for name in ROLLUPS:
+        statements.append(
+            f"CREATE TABLE IF NOT EXISTS rollup_{name} (city TEXT NOT NULL, bucket INTEGER NOT NULL, "
+            f"n INTEGER NOT NULL, {aggregates}, PRIMARY KEY (city, bucket)) WITHOUT ROWID"
+        )
+    return statements
+
+
+def _rekey(conn: sqlite3.Connection):
+    # Rows from before version 1 carry the bare name. A name maps to its first catalog region, as
+    # "All Cities" does; a duplicate point for the same key and time is dropped.
+    from city_index import city_keys
+
+    tables = ("observations",) + tuple(f"rollup_{name}" for name in ROLLUPS)
+    names = {name for table in tables for (name,) in conn.execute(f"SELECT DISTINCT city FROM {table}")}
+    for name, key in city_keys(sorted(names)).items():
+        for table in tables:
+            conn.execute(f"UPDATE OR IGNORE {table} SET city = ? WHERE city = ?", (key, name))
+            conn.execute(f"DELETE FROM {table} WHERE city = ?", (name,))
+
+
+def _rollup_sql(name: str, seconds: int) -> str:
+    selects = ", ".join(f"{agg.upper()}({f})" for f in HISTORY_FIELDS for agg in ("sum", "min", "max"))
+    updates = ", ".join(
+        f"{f}_sum = {f}_sum + excluded.{f}_sum, "
+        f"{f}_min = MIN({f}_min, excluded.{f}_min), "
+        f"{f}_max = MAX({f}_max, excluded.{f}_max)"
+        for f in HISTORY_FIELDS
+    )
+    return (
+        f"INSERT INTO rollup_{name} (city, bucket, n, {', '.join(_AGGREGATES)}) "
+        f"SELECT city, CAST(ts / {seconds} AS INTEGER) * {seconds}, COUNT(*), {selects} "
+        f"FROM temp.batch WHERE true GROUP BY 1, 2 "
+        f"ON CONFLICT (city, bucket) DO UPDATE SET n = n + excluded.n, {updates}"
+    )
+
+
+class HistoryDB:
+    def __init__(self, path: str = HISTORY_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._pending: List[Tuple] = []
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        with self._connection() as conn:
+            for statement in _schema():
+                conn.execute(statement)
+            (version,) = conn.execute("PRAGMA user_version").fetchone()
+            if version < SCHEMA_VERSION:
+                _rekey(conn)
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def submit(self, city: str, timestamp: float, values: Tuple[float, ...]):
+        with self._pending_lock:
+            self._pending.append((city, timestamp) + tuple(values))
+            self._trim()
+            if len(self._pending) >= FLUSH_BATCH_SIZE:
+                self._wake.set()
+
+    def _trim(self):
+        # Caller holds _pending_lock.
+        excess = len(self._pending) - MAX_PENDING_ROWS
+        if excess > 0:
+            del self._pending[:excess]
+            metrics.inc("weather_history_dropped_rows_total", excess)
+
+    def flush(self) -> int:
+        with self._pending_lock:
+            rows, self._pending = self._pending, []
+        if not rows:
+            return 0
+        try:
+            self._write(rows)
+        except BaseException:
+            # The transaction rolled back; put the batch back in front of anything newer and let
+            # the next flush retry it. Rows already on disk are skipped then, so nothing doubles.
+            with self._pending_lock:
+                self._pending[:0] = rows
+                self._trim()
+            raise
+        return len(rows)
+
+    def _write(self, rows: List[Tuple]):
+        placeholders = ", ".join("?" * (2 + len(HISTORY_FIELDS)))
+        columns = ", ".join(("city", "ts") + HISTORY_FIELDS)
+        with self._write_lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS batch AS SELECT {columns} FROM observations WHERE 0")
+                conn.execute("DELETE FROM temp.batch")
+                conn.executemany(f"INSERT INTO temp.batch ({columns}) VALUES ({placeholders})", rows)
+                # Rows already on disk (e.g. re-sent after a restart) must not be counted twice.
+                conn.execute("DELETE FROM temp.batch WHERE EXISTS (SELECT 1 FROM observations o "
+                             "WHERE o.city = batch.city AND o.ts = batch.ts)")
+                conn.execute(f"INSERT OR IGNORE INTO observations ({columns}) SELECT {columns} FROM temp.batch")
+                for name, seconds in ROLLUPS.items():
+                    conn.execute(_rollup_sql(name, seconds))
+
+    def _run(self):
+        while True:
+            self._wake.wait(FLUSH_INTERVAL)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # Any failure, not only sqlite3.Error: the writer must outlive it.
+                metrics.inc("weather_history_flush_errors_total", error=type(e).__name__)
+
+    def tail(self, city: str, n: int) -> List[Tuple]:
+        columns = ", ".join(("ts",) + HISTORY_FIELDS)
+        rows = self._connection().execute(
+            f"SELECT {columns} FROM observations WHERE city = ? ORDER BY ts DESC LIMIT ?", (city, n)
+        ).fetchall()
+        return rows[::-1]
+
+    def load_range(self, city: str, start: float, end: float, resolution: str = "raw") -> Dict[str, np.ndarray]:
+        # Range scans on the (city, ts|bucket) primary key; only the requested rows are read.
+        if resolution == "raw":
+            names = ("timestamp",) + HISTORY_FIELDS
+            sql = (f"SELECT ts, {', '.join(HISTORY_FIELDS)} FROM observations "
+                   "WHERE city = ? AND ts >= ? AND ts < ? ORDER BY ts")
+        else:
+            names = ("timestamp",) + HISTORY_FIELDS + ("temp_min", "temp_max")
+            means = ", ".join(f"{f}_sum / n" for f in HISTORY_FIELDS)
+            sql = (f"SELECT bucket, {means}, temp_min, temp_max FROM rollup_{resolution} "
+                   "WHERE city = ? AND bucket >= ? AND bucket < ? ORDER BY bucket")
+        rows = self._connection().execute(sql, (city, start, end)).fetchall()
+        data = np.array(rows, dtype=float).reshape(-1, len(names))
+        return dict(zip(names, data.T))
+
+
+_history_db: Optional[HistoryDB] = None
+_history_db_lock = threading.Lock()
+
+
+def get_history_db(path: str = HISTORY_DB_PATH) -> Optional[HistoryDB]:
+    if not path:
+        return None
+    global _history_db
+    if _history_db is None:
+        with _history_db_lock:
+            if _history_db is None:
+                _history_db = HistoryDB(path)
+    return _history_db
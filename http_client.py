@@ -0,0 +1,192 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from metrics import metrics
+
+# Connection pool shared by every session and rerun in this process.
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 32
+
+# Retry policy: full-jitter exponential backoff, capped so a rerun never stalls for long.
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Circuit breaker: this many consecutive timeouts/5xx (or a single 401) open the circuit,
+# and after BREAKER_COOLDOWN one half-open probe decides whether it closes again.
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_COOLDOWN = 30.0
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    pass
+
+
+class CircuitBreaker:
+    def __init__(self, threshold: int = BREAKER_FAILURE_THRESHOLD, cooldown: float = BREAKER_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.cooldown:
+                self.state = "half-open"
+                self._probing = False
+            if self.state == "half-open" and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self, trip: bool = False):
+        with self._lock:
+            self._failures += 1
+            if trip or self.state == "half-open" or self._failures >= self.threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+
+upstream_breaker = CircuitBreaker()
+
+
+# Connection set-up (DNS lookup, TCP and TLS handshakes) is timed where urllib3 performs it;
+# requests only reports the total time to response headers.
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        with metrics.timer("weather_phase_seconds", phase="connect"):
+            super().connect()
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        with metrics.timer("weather_phase_seconds", phase="connect"):
+            super().connect()
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPConnectionPool,
+                                                   "https": _TimedHTTPSConnectionPool}
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = _TimedHTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def retry_after_seconds(resp: requests.Response) -> Optional[float]:
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    if retry_after is not None:
+        return retry_after + random.uniform(0, BACKOFF_BASE)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def _backoff(attempt: int, reason: str, retry_after: Optional[float] = None):
+    metrics.inc("weather_upstream_retries_total", reason=reason)
+    with metrics.timer("weather_phase_seconds", phase="backoff"):
+        time.sleep(backoff_delay(attempt, retry_after))
+
+
+def get_json(url: str, params: Dict, timeout: float, attempts: int) -> Dict:
+    session = get_session()
+    attempts = max(1, attempts)
+    for attempt in range(attempts):
+        last_attempt = attempt == attempts - 1
+        if not upstream_breaker.allow():
+            raise CircuitOpenError("Weather service is unavailable; retrying shortly.")
+        start = time.perf_counter()
+        try:
+            resp = session.get(url, params=params, timeout=timeout)
+        except requests.exceptions.Timeout:
+            upstream_breaker.record_failure()
+            metrics.inc("weather_upstream_requests_total", status="timeout")
+            if last_attempt:
+                raise
+            _backoff(attempt, "timeout")
+            continue
+        except requests.exceptions.RequestException:
+            upstream_breaker.record_failure()
+            metrics.inc("weather_upstream_requests_total", status="error")
+            raise
+        # elapsed runs to the response headers; the rest of get() is reading the body.
+        response = resp.elapsed.total_seconds()
+        metrics.observe("weather_phase_seconds", response, phase="response")
+        metrics.observe("weather_phase_seconds", max(0.0, time.perf_counter() - start - response),
+                        phase="download")
+        metrics.inc("weather_upstream_requests_total", status=str(resp.status_code))
+
+        if resp.status_code == 401:
+            upstream_breaker.record_failure(trip=True)
+        elif resp.status_code >= 500:
+            upstream_breaker.record_failure()
+        else:
+            upstream_breaker.record_success()
+
+        if resp.status_code in RETRY_STATUSES and not last_attempt:
+            retry_after = retry_after_seconds(resp)
+            # A Retry-After longer than we are willing to block a rerun for is a give-up.
+            if retry_after is None or retry_after <= BACKOFF_MAX:
+                _backoff(attempt, str(resp.status_code), retry_after)
+                continue
+
+        resp.raise_for_status()
+        with metrics.timer("weather_phase_seconds", phase="decode"):
+            return resp.json()
@@ -0,0 +1,296 @@
+import math
+import os
+import threading
+import time
+import uuid
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from cadence import cadence
+from city_index import city_keys, resolve_city_ids
+from config import REFRESH_OPTIONS
+from forecast import Forecast, cached_forecasts, fetch_forecasts, missing_forecasts
+from history import weather_history
+from metrics import metrics
+from state_backend import LatestEntry, StateBackend, get_state_backend
+from weather_api import GROUP_BATCH_SIZE, FetchResult, fetch_weather_many, renamed
+
+POLL_INTERVAL = 1.0
+# With a shared state backend this is the budget of all replicas together.
+CALLS_PER_MINUTE = int(os.getenv("OPENWEATHER_CALLS_PER_MINUTE", "60"))
+# Sessions re-register on every rerun; one that has not been heard from in this long is gone.
+WATCH_TTL = 2 * max(REFRESH_OPTIONS.values())
+# A shared entry counts as newer than ours only past this, so clock conversion jitter is ignored.
+SYNC_SLACK = 1.0
+FORECAST_CLAIM_PREFIX = "forecast:"
+
+
+class SnapshotEntry(NamedTuple):
+    result: FetchResult
+    fetched_at: float
+    previous_temp: Optional[float] = None
+
+
+class _Watch(NamedTuple):
+    cities: tuple
+    keys: tuple  # city_keys of cities, in the same order
+    region: Optional[str]
+    max_age: float
+    seen_at: float
+
+
+class IngestionScheduler:
+    def __init__(self, api_key: Optional[str], base_url: str, calls_per_minute: int = CALLS_PER_MINUTE,
+                 backend: Optional[StateBackend] = None):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.calls_per_minute = calls_per_minute
+        # Replicas pointed at the same backend share observations, fetch claims and the call budget.
+        self.backend = backend or get_state_backend()
+        self.owner = uuid.uuid4().hex
+        self._watches: Dict[str, _Watch] = {}
+        # Sessions showing forecasts, kept apart so they are fetched with polling on or off.
+        self._forecast_watches: Dict[str, _Watch] = {}
+        self._watch_lock = threading.Lock()
+        # Keyed by city_keys identity, not by name: "Newcastle" in GB and in AU are two entries.
+        self._snapshot: Mapping[str, SnapshotEntry] = MappingProxyType({})
+        self._publish_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="weather-ingestion", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stopping = True
+        self._wake.set()
+
+    def watch(self, session_id: str, cities: List[str], region: Optional[str], max_age: float) -> Dict[str, str]:
+        keys = city_keys(cities, region)
+        with self._watch_lock:
+            previous = self._watches.get(session_id)
+            self._watches[session_id] = _Watch(tuple(cities), tuple(keys[city] for city in cities), region,
+                                               max_age, time.monotonic())
+        if previous is None or set(previous.keys) != set(keys.values()):
+            self._wake.set()
+        return keys
+
+    def forecasts(self, session_id: str, cities: List[str], region: Optional[str]) -> List[Optional[Forecast]]:
+        # Never fetches: the poller loads missing forecasts out of the same call budget and
+        # claims as observations, and a later tick renders them.
+        keys = city_keys(cities, region)
+        with self._watch_lock:
+            previous = self._forecast_watches.get(session_id)
+            self._forecast_watches[session_id] = _Watch(tuple(cities), tuple(keys[city] for city in cities),
+                                                        region, 0.0, time.monotonic())
+        if previous is None or set(previous.keys) != set(keys.values()):
+            self._wake.set()
+        return cached_forecasts(cities, region)
+
+    def snapshot(self) -> Mapping[str, SnapshotEntry]:
+        # A plain reference read: the poller swaps in a new mapping, it never mutates one.
+        return self._snapshot
+
+    def publish(self, results: List[FetchResult], region: Optional[str] = None):
+        # results come from one fetch_weather_many call for region.
+        keys = city_keys([result.city for result in results], region)
+        # Shared first, so the local snapshot carries the same previous_temp on every replica.
+        shared = self.backend.publish({keys[r.city]: r.record for r in results if r.record is not None},
+                                      time.time())
+        self._merge([(keys[result.city], result) for result in results], shared)
+
+    def _merge(self, results: List[Tuple[str, FetchResult]], shared: Dict[str, LatestEntry]):
+        now, wall_now = time.monotonic(), time.time()
+        with self._publish_lock:
+            snapshot = dict(self._snapshot)
+            for key, result in results:
+                previous = snapshot.get(key)
+                entry = shared.get(key)
+                if entry is not None:
+                    # The backend may hold a newer observation than this one, fetched elsewhere.
+                    snapshot[key] = SnapshotEntry(result._replace(record=entry.record),
+                                                  now - (wall_now - entry.fetched_at), entry.previous_temp)
+                elif previous is None or previous.result.record is None:
+                    # Otherwise keep showing the last good observation; it ages until a fetch succeeds.
+                    snapshot[key] = SnapshotEntry(result, now)
+            self._snapshot = MappingProxyType(snapshot)
+
+    def _sync(self, targets: Dict[str, str]):
+        # targets: key -> city. Adopt what other replicas fetched since we last looked; those
+        # cities stop being due here.
+        shared = self.backend.latest(targets)
+        if not shared:
+            return
+        snapshot = self.snapshot()
+        offset = time.time() - time.monotonic()
+        newer = {}
+        for key, entry in shared.items():
+            local = snapshot.get(key)
+            if (local is None or local.result.record is None
+                    or entry.fetched_at - offset > local.fetched_at + SYNC_SLACK):
+                newer[key] = entry
+        if not newer:
+            return
+        for key, entry in newer.items():
+            cadence.observe(key, entry.record.observed_at, entry.fetched_at)
+        weather_history.record_many({key: entry.record for key, entry in newer.items()})
+        self._merge([(key, FetchResult(targets[key], entry.record)) for key, entry in newer.items()], newer)
+
+    def entries(self, session_id: str, cities: List[str], region: Optional[str], max_age: float,
+                block: bool = True) -> List[Optional[SnapshotEntry]]:
+        keys = self.watch(session_id, cities, region, max_age)
+        snapshot = self.snapshot()
+        missing = [city for city in cities if keys[city] not in snapshot]
+        if missing:
+            # Another replica may already have them.
+            self._sync({keys[city]: city for city in missing})
+            snapshot = self.snapshot()
+            missing = [city for city in cities if keys[city] not in snapshot]
+        if missing and block:
+            # Only cities nobody has watched yet cost a blocking fetch.
+            self.publish(fetch_weather_many(missing, self.api_key, self.base_url,
+                                            max_age=max_age, region=region), region)
+            snapshot = self.snapshot()
+        # Without block, unseen cities come back as None; watch() has already woken the poller.
+        return [_named(snapshot.get(keys[city]), city) for city in cities]
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(POLL_INTERVAL)
+            self._wake.clear()
+            if self._stopping:
+                break
+            try:
+                self._tick()
+            except Exception as e:
+                # Counted, not printed: a locked backend would otherwise log every POLL_INTERVAL.
+                metrics.inc("weather_ingestion_errors_total", error=type(e).__name__)
+
+    def _active_watches(self, now: float, watches: Optional[Dict[str, _Watch]] = None) -> List[_Watch]:
+        watches = self._watches if watches is None else watches
+        with self._watch_lock:
+            for session_id in [s for s, w in watches.items() if now - w.seen_at > WATCH_TTL]:
+                del watches[session_id]
+            return list(watches.values())
+
+    def _due(self, now: float) -> List[tuple]:
+        # (priority, key, city, region), most urgent first. Any (city, region) that maps to a key
+        # fetches the same place, so whichever watch named it first is used for the fetch.
+        viewers: Dict[str, int] = {}
+        max_age: Dict[str, float] = {}
+        targets: Dict[str, Tuple[str, Optional[str]]] = {}
+        for watch in self._active_watches(now):
+            for city, key in zip(watch.cities, watch.keys):
+                viewers[key] = viewers.get(key, 0) + 1
+                max_age[key] = min(max_age.get(key, watch.max_age), watch.max_age)
+                targets.setdefault(key, (city, watch.region))
+
+        snapshot = self.snapshot()
+        wall_now = time.time()
+        due = []
+        for key, count in viewers.items():
+            entry = snapshot.get(key)
+            staleness = float("inf") if entry is None else (now - entry.fetched_at) / max_age[key]
+            # An expired city is still skipped while its next provider observation is not due yet.
+            if staleness >= 1 and (entry is None or cadence.new_data_expected(key, wall_now)):
+                due.append((count * staleness, key) + targets[key])
+        due.sort(key=lambda item: item[0], reverse=True)
+        return due
+
+    def _due_forecasts(self, now: float) -> List[tuple]:
+        # (key, city, region) of watched forecasts with nothing cached this cycle, most watched first.
+        viewers: Dict[str, int] = {}
+        targets: Dict[str, Tuple[str, Optional[str]]] = {}
+        for watch in self._active_watches(now, self._forecast_watches):
+            for city, key in zip(watch.cities, watch.keys):
+                viewers[key] = viewers.get(key, 0) + 1
+                targets.setdefault(key, (city, watch.region))
+        by_region: Dict[Optional[str], List[str]] = {}
+        for city, region in targets.values():
+            by_region.setdefault(region, []).append(city)
+        missing = {(city, region) for region, cities in by_region.items()
+                   for city in missing_forecasts(cities, region)}
+        due = [(key,) + target for key, target in targets.items() if target in missing]
+        due.sort(key=lambda item: viewers[item[0]], reverse=True)
+        return due
+
+    def _plan(self, due: List[tuple], allowance: int) -> Tuple[Dict[Optional[str], List[str]], int]:
+        # Cities with a catalog ID share /group requests, so only every GROUP_BATCH_SIZE-th
+        # one per region costs a call.
+        selected: Dict[Optional[str], List[str]] = {}
+        ids_per_region: Dict[Optional[str], int] = {}
+        calls = 0
+        for _, _, city, region in due:
+            has_id = bool(resolve_city_ids([city], region))
+            extra = 1 if not has_id or ids_per_region.get(region, 0) % GROUP_BATCH_SIZE == 0 else 0
+            if calls + extra > allowance:
+                break
+            calls += extra
+            if has_id:
+                ids_per_region[region] = ids_per_region.get(region, 0) + 1
+            selected.setdefault(region, []).append(city)
+        return selected, calls
+
+    def _tick(self):
+        now = time.monotonic()
+        due = self._due(now)
+        if due:
+            self._sync({key: city for _, key, city, _ in due})
+            due = self._due(now)
+        forecasts = self._due_forecasts(now)
+        if not due and not forecasts:
+            return
+
+        wall_now = time.time()
+        # Spread the budget across ticks instead of spending a minute's worth in one burst.
+        per_tick = max(1, math.ceil(self.calls_per_minute * POLL_INTERVAL / 60))
+        allowance = self.backend.reserve_calls(per_tick, self.calls_per_minute, wall_now)
+        if allowance <= 0:
+            return
+        selected, calls = self._plan(due, allowance)
+        # A city another replica is already fetching is left to it; _sync picks the result up.
+        planned = {(city, region) for region, cities in selected.items() for city in cities}
+        wanted = [key for _, key, city, region in due if (city, region) in planned]
+        won = set(self.backend.claim(wanted, self.owner, wall_now))
+        if len(won) < len(wanted):
+            selected, calls = self._plan([item for item in due if item[1] in won], allowance)
+        # Forecasts get what observations leave, one call per city; their claims are prefixed so
+        # they never collide with the observation of the same city.
+        forecast_keys = {FORECAST_CLAIM_PREFIX + key: (city, region)
+                         for key, city, region in forecasts[:allowance - calls]}
+        won = self.backend.claim(list(forecast_keys), self.owner, wall_now) if forecast_keys else []
+        forecast_cities: Dict[Optional[str], List[str]] = {}
+        for key in won:
+            city, region = forecast_keys[key]
+            forecast_cities.setdefault(region, []).append(city)
+        calls += len(won)
+        self.backend.release_calls(allowance - calls, wall_now)
+
+        for region, cities in selected.items():
+            results = fetch_weather_many(cities, self.api_key, self.base_url, max_age=0, region=region)
+            self.publish(results, region)
+        for region, cities in forecast_cities.items():
+            fetch_forecasts(cities, self.api_key, self.base_url, region)
+
+
+def _named(entry: Optional[SnapshotEntry], city: str) -> Optional[SnapshotEntry]:
+    # An entry is shared by every name that maps to its key; show it under the one asked for.
+    return entry if entry is None else entry._replace(result=renamed(entry.result, city))
+
+
+_scheduler: Optional[IngestionScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler(api_key: Optional[str], base_url: str) -> IngestionScheduler:
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                scheduler = IngestionScheduler(api_key, base_url)
+                scheduler.start()
+                _scheduler = scheduler
+    return _scheduler
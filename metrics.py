@@ -0,0 +1,186 @@
+import bisect
+import functools
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Latency buckets in seconds, Prometheus-style upper bounds.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRICS_PORT = int(os.getenv("WEATHER_METRICS_PORT", "0"))
+METRICS_FILE = os.getenv("WEATHER_METRICS_FILE", "")
+METRICS_FILE_INTERVAL = 15.0
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        # Linear interpolation inside the bucket, as Prometheus' histogram_quantile does.
+        if not self.count:
+            return math.nan
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._help: Dict[str, str] = {}
+        self._collectors: List[Callable[[], Dict[str, float]]] = []
+        self._lock = threading.Lock()
+
+    def describe(self, name: str, text: str):
+        self._help[name] = text
+
+    def observe(self, name: str, seconds: float, **labels: str):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(seconds)
+
+    def inc(self, name: str, amount: float = 1, **labels: str):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def add_collector(self, collect: Callable[[], Dict[str, float]]):
+        # Called at export time for values other modules already track (cache stats, ...).
+        self._collectors.append(collect)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, name: str, **labels: str):
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def histograms(self, name: str) -> Dict[Labels, Histogram]:
+        with self._lock:
+            return dict(self._histograms.get(name, {}))
+
+    def render_prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            histograms = {name: dict(series) for name, series in self._histograms.items()}
+            counters = {name: dict(series) for name, series in self._counters.items()}
+        for name, series in sorted(histograms.items()):
+            lines += _header(name, "histogram", self._help.get(name))
+            for labels, h in sorted(series.items()):
+                cumulative = 0
+                for bound, n in zip(h.buckets + (math.inf,), h.counts):
+                    cumulative += n
+                    le = "+Inf" if bound == math.inf else repr(bound)
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {h.sum:.6f}")
+                lines.append(f"{name}_count{_labels(labels)} {h.count}")
+        for name, series in sorted(counters.items()):
+            lines += _header(name, "counter", self._help.get(name))
+            for labels, value in sorted(series.items()):
+                lines.append(f"{name}{_labels(labels)} {value:g}")
+        for collect in self._collectors:
+            for name, value in collect().items():
+                lines += _header(name, "gauge", self._help.get(name))
+                lines.append(f"{name} {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+def _header(name: str, kind: str, text: Optional[str]) -> List[str]:
+    return ([f"# HELP {name} {text}"] if text else []) + [f"# TYPE {name} {kind}"]
+
+
+def _labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in labels)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + "}"
+
+
+metrics = MetricsRegistry()
+metrics.describe("weather_phase_seconds", "Time spent per phase of a fetch or rerun.")
+metrics.describe("weather_city_fetch_seconds", "Upstream fetch latency per city.")
+metrics.describe("weather_upstream_requests_total", "Upstream HTTP responses by status.")
+metrics.describe("weather_upstream_retries_total", "Upstream retries by reason.")
+metrics.describe("weather_fetch_errors_total", "Failed city fetches by error level.")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = metrics.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _write_file(path: str):
+    while True:
+        time.sleep(METRICS_FILE_INTERVAL)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(metrics.render_prometheus())
+        # Atomic swap so a scraper never reads half a file.
+        os.replace(tmp, path)
+
+
+_exporter_started = False
+_exporter_lock = threading.Lock()
+
+
+def start_exporter(port: int = METRICS_PORT, path: str = METRICS_FILE):
+    # Once per process: Streamlit re-executes the script on every rerun.
+    global _exporter_started
+    with _exporter_lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+    if port:
+        server = ThreadingHTTPServer(("0.0.0.0", port), _MetricsHandler)
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    if path:
+        threading.Thread(target=_write_file, args=(path,), name="metrics-file", daemon=True).start()
@@ -0,0 +1,38 @@
+import time
+from typing import Dict, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+NUMERIC_FIELDS = ("timestamp", "temp", "feels_like", "humidity", "pressure", "wind")
+
+
+class Observation(NamedTuple):
+    # Raw values only; dates, times and units are formatted when a card or table is drawn.
+    city: str
+    timestamp: float  # when we fetched it, epoch seconds
+    observed_at: Optional[float]  # provider observation time; repeats of one observation share it
+    temp: float
+    feels_like: float
+    humidity: float
+    pressure: float
+    wind: float
+    description: str
+    digest: int
+
+
+def observation_columns(records: Sequence[Observation]) -> Dict[str, np.ndarray]:
+    # One C-level transpose of the tuples, then a typed array per field; no per-record dicts.
+    if not records:
+        return {field: np.empty(0, dtype=float if field in NUMERIC_FIELDS else object)
+                for field in Observation._fields}
+    columns = {}
+    for field, values in zip(Observation._fields, zip(*records)):
+        if field in NUMERIC_FIELDS:
+            columns[field] = np.fromiter(values, dtype=float, count=len(records))
+        else:
+            columns[field] = np.array(values, dtype=object)
+    return columns
+
+
+def format_fetched_at(record: Observation) -> str:
+    return time.strftime("📅 %Y-%m-%d | 🕒 %H:%M:%S", time.localtime(record.timestamp))
@@ -0,0 +1,236 @@
+import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional
+
+from observation import Observation
+
+# Empty keeps state in this process; a path shares it with every replica that opens the same file.
+STATE_DB_PATH = os.getenv("WEATHER_STATE_DB", "")
+# A replica that claimed a city but never published it (crashed, upstream failed) loses it after this.
+CLAIM_SECONDS = 30.0
+RATE_WINDOW = 60
+
+
+class LatestEntry(NamedTuple):
+    record: Observation
+    fetched_at: float  # wall clock: replicas do not share a monotonic clock
+    previous_temp: Optional[float]  # temp of the observation before this one
+
+
+class StateBackend(ABC):
+    # Latest observation per city, who is fetching what, and the upstream call budget. Cities are
+    # city_index.city_keys identities, never bare names: "Newcastle" in GB and AU are two rows.
+    # History is not part of it: replicas pointing WEATHER_HISTORY_DB at one file share that.
+    @abstractmethod
+    def latest(self, keys: Iterable[str]) -> Dict[str, LatestEntry]:
+        ...
+
+    @abstractmethod
+    def publish(self, records: Mapping[str, Observation], fetched_at: float) -> Dict[str, LatestEntry]:
+        # records: key -> observation. Returns what the backend holds for those keys afterwards.
+        ...
+
+    @abstractmethod
+    def claim(self, keys: List[str], owner: str, now: float) -> List[str]:
+        # The keys, of those asked for, this owner may fetch now; the rest are someone else's.
+        ...
+
+    @abstractmethod
+    def reserve_calls(self, wanted: int, per_minute: int, now: float) -> int:
+        ...
+
+    @abstractmethod
+    def release_calls(self, count: int, now: float):
+        ...
+
+
+def _next_entry(previous: Optional[LatestEntry], record: Observation, fetched_at: float) -> LatestEntry:
+    if previous is None:
+        return LatestEntry(record, fetched_at, None)
+    if previous.record.digest == record.digest:
+        return LatestEntry(record, max(previous.fetched_at, fetched_at), previous.previous_temp)
+    return LatestEntry(record, fetched_at, previous.record.temp)
+
+
+class MemoryBackend(StateBackend):
+    def __init__(self):
+        self._latest: Dict[str, LatestEntry] = {}
+        self._claims: Dict[str, tuple] = {}
+        self._calls: deque = deque()
+        self._lock = threading.Lock()
+
+    def latest(self, keys: Iterable[str]) -> Dict[str, LatestEntry]:
+        with self._lock:
+            return {key: self._latest[key] for key in keys if key in self._latest}
+
+    def publish(self, records: Mapping[str, Observation], fetched_at: float) -> Dict[str, LatestEntry]:
+        published = {}
+        with self._lock:
+            for key, record in records.items():
+                previous = self._latest.get(key)
+                if previous is not None and (record.observed_at or 0) < (previous.record.observed_at or 0):
+                    published[key] = previous
+                    continue
+                published[key] = self._latest[key] = _next_entry(previous, record, fetched_at)
+                self._claims.pop(key, None)
+        return published
+
+    def claim(self, keys: List[str], owner: str, now: float) -> List[str]:
+        won = []
+        with self._lock:
+            for key in keys:
+                holder, expires = self._claims.get(key, (owner, 0.0))
+                if holder == owner or expires < now:
+                    self._claims[key] = (owner, now + CLAIM_SECONDS)
+                    won.append(key)
+        return won
+
+    def reserve_calls(self, wanted: int, per_minute: int, now: float) -> int:
+        with self._lock:
+            while self._calls and now - self._calls[0] > RATE_WINDOW:
+                self._calls.popleft()
+            granted = max(0, min(wanted, per_minute - len(self._calls)))
+            self._calls.extend([now] * granted)
+            return granted
+
+    def release_calls(self, count: int, now: float):
+        with self._lock:
+            for _ in range(min(count, len(self._calls))):
+                self._calls.pop()
+
+
+# Bumped whenever a table changes shape. Everything here is short-lived (latest observations,
+# 30 s claims, a minute of calls), so an older file is simply dropped and rebuilt.
+SCHEMA_VERSION = 2
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS latest (key TEXT PRIMARY KEY, record TEXT NOT NULL, observed_at REAL, "
+    "digest INTEGER NOT NULL, temp REAL NOT NULL, fetched_at REAL NOT NULL, previous_temp REAL) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS claims (key TEXT PRIMARY KEY, owner TEXT NOT NULL, "
+    "expires REAL NOT NULL) WITHOUT ROWID",
+    "CREATE TABLE IF NOT EXISTS calls (second INTEGER PRIMARY KEY, n INTEGER NOT NULL)",
+)
+
+# An older observation never replaces a newer one; a repeat of the current one only refreshes
+# fetched_at, so previous_temp always belongs to the observation before the latest.
+_PUBLISH_SQL = (
+    "INSERT INTO latest (key, record, observed_at, digest, temp, fetched_at, previous_temp) "
+    "VALUES (?, ?, ?, ?, ?, ?, NULL) "
+    "ON CONFLICT (key) DO UPDATE SET "
+    "previous_temp = CASE WHEN latest.digest = excluded.digest THEN latest.previous_temp ELSE latest.temp END, "
+    "fetched_at = MAX(latest.fetched_at, excluded.fetched_at), "
+    "record = excluded.record, observed_at = excluded.observed_at, digest = excluded.digest, temp = excluded.temp "
+    "WHERE COALESCE(excluded.observed_at, 0) >= COALESCE(latest.observed_at, 0)"
+)
+
+_CLAIM_SQL = (
+    "INSERT INTO claims (key, owner, expires) VALUES (?, ?, ?) "
+    "ON CONFLICT (key) DO UPDATE SET owner = excluded.owner, expires = excluded.expires "
+    "WHERE claims.owner = excluded.owner OR claims.expires < ?"
+)
+
+
+class SQLiteBackend(StateBackend):
+    # Every replica on the host (or on a shared volume with working locks) opens the same file.
+    def __init__(self, path: str = STATE_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._transaction() as conn:
+            (version,) = conn.execute("PRAGMA user_version").fetchone()
+            if version != SCHEMA_VERSION:
+                conn.execute("DROP TABLE IF EXISTS latest")
+                conn.execute("DROP TABLE IF EXISTS claims")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so read-then-write steps are atomic
+        # across processes.
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        return _Transaction(conn)
+
+    def _select(self, conn: sqlite3.Connection, keys: List[str]) -> Dict[str, LatestEntry]:
+        entries = {}
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            rows = conn.execute(
+                f"SELECT key, record, fetched_at, previous_temp FROM latest "
+                f"WHERE key IN ({', '.join('?' * len(chunk))})", chunk,
+            ).fetchall()
+            for key, record, fetched_at, previous_temp in rows:
+                entries[key] = LatestEntry(Observation(*json.loads(record)), fetched_at, previous_temp)
+        return entries
+
+    def latest(self, keys: Iterable[str]) -> Dict[str, LatestEntry]:
+        return self._select(self._connection(), list(keys))
+
+    def publish(self, records: Mapping[str, Observation], fetched_at: float) -> Dict[str, LatestEntry]:
+        keys = list(records)
+        with self._transaction() as conn:
+            conn.executemany(_PUBLISH_SQL, [
+                (key, json.dumps(r, ensure_ascii=False), r.observed_at, r.digest, r.temp, fetched_at)
+                for key, r in records.items()
+            ])
+            conn.executemany("DELETE FROM claims WHERE key = ?", [(key,) for key in keys])
+            return self._select(conn, keys)
+
+    def claim(self, keys: List[str], owner: str, now: float) -> List[str]:
+        with self._transaction() as conn:
+            conn.executemany(_CLAIM_SQL, [(key, owner, now + CLAIM_SECONDS, now) for key in keys])
+            held = {key for (key,) in conn.execute("SELECT key FROM claims WHERE owner = ?", (owner,))}
+        return [key for key in keys if key in held]
+
+    def reserve_calls(self, wanted: int, per_minute: int, now: float) -> int:
+        second = int(now)
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM calls WHERE second <= ?", (second - RATE_WINDOW,))
+            (used,) = conn.execute("SELECT COALESCE(SUM(n), 0) FROM calls").fetchone()
+            granted = max(0, min(wanted, per_minute - used))
+            if granted:
+                conn.execute("INSERT INTO calls (second, n) VALUES (?, ?) "
+                             "ON CONFLICT (second) DO UPDATE SET n = n + excluded.n", (second, granted))
+        return granted
+
+    def release_calls(self, count: int, now: float):
+        if count <= 0:
+            return
+        with self._transaction() as conn:
+            conn.execute("UPDATE calls SET n = MAX(0, n - ?) WHERE second = ?", (count, int(now)))
+
+
+class _Transaction:
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+_backend: Optional[StateBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_state_backend(path: str = STATE_DB_PATH) -> StateBackend:
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = SQLiteBackend(path) if path else MemoryBackend()
+    return _backend
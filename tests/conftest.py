@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The modules live at the repository root, next to app.py, and are imported by bare name.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Nothing a test records may reach the real history database.
+os.environ["WEATHER_HISTORY_DB"] = ""
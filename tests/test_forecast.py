@@ -0,0 +1,38 @@
+import time
+
+import numpy as np
+
+from benchmarks.bench_forecast import per_city_summary
+from benchmarks.fake_openweather import forecast_payload
+from config import ALL_CITIES
+from forecast import FORECAST_DAYS, _parse_forecast, current_cycle, daily_summary
+
+
+def test_daily_summary_matches_per_city_loop():
+    now = time.time()
+    forecasts = [_parse_forecast(forecast_payload(city), current_cycle(now)) for city in ALL_CITIES[:25]]
+    summary = daily_summary(forecasts, now)
+    expected = per_city_summary(forecasts, now)
+
+    for row, days in enumerate(expected):
+        for day, values in enumerate(days):
+            got = (summary.temp_min[row, day], summary.temp_max[row, day], summary.temp_mean[row, day],
+                   summary.precipitation[row, day])
+            if values is None:
+                assert np.isnan(got).all()
+            else:
+                np.testing.assert_allclose(got, values)
+
+
+def test_missing_forecast_is_a_nan_row():
+    now = time.time()
+    forecast = _parse_forecast(forecast_payload("Paris"), current_cycle(now))
+    summary = daily_summary([None, forecast], now)
+    assert summary.temp_max.shape == (2, FORECAST_DAYS)
+    assert np.isnan(summary.temp_max[0]).all()
+    assert not np.isnan(summary.temp_max[1]).all()
+
+
+def test_no_forecasts():
+    summary = daily_summary([])
+    assert summary.temp_min.shape == (0, FORECAST_DAYS)
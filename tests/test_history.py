@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from config import HISTORY_FIELDS
+from history import CityHistory
+
+
+def _filled(capacity, count):
+    history = CityHistory(capacity)
+    for t in range(count):
+        history.append(float(t), tuple(float(t * 10 + i) for i in range(len(HISTORY_FIELDS))))
+    return history
+
+
+def test_window_before_wraparound():
+    history = _filled(4, 3)
+    assert len(history) == 3
+    np.testing.assert_array_equal(history.window()["timestamp"], [0, 1, 2])
+    np.testing.assert_array_equal(history.window(2)["temp"], [10, 20])
+
+
+def test_wraparound_keeps_newest_rows_in_order():
+    history = _filled(3, 5)
+    assert len(history) == 3
+    assert history.last_timestamp == 4
+    window = history.window()
+    np.testing.assert_array_equal(window["timestamp"], [2, 3, 4])
+    np.testing.assert_array_equal(window[HISTORY_FIELDS[-1]], [24, 34, 44])
+    np.testing.assert_array_equal(history.window(2)["timestamp"], [3, 4])
+    # Asking for more than is stored returns what there is.
+    assert len(history.window(10)["timestamp"]) == 3
+
+
+def test_window_is_a_read_only_view():
+    window = _filled(3, 5).window()
+    with pytest.raises(ValueError):
+        window["temp"][0] = 0.0
+
+
+def test_empty_history():
+    history = CityHistory(3)
+    assert len(history) == 0 and history.last_timestamp is None
+    assert len(history.window()["timestamp"]) == 0
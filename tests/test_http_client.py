@@ -0,0 +1,50 @@
+import pytest
+
+import http_client
+from http_client import CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(http_client.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_breaker_opens_after_threshold_failures(clock):
+    breaker = CircuitBreaker(threshold=3, cooldown=30)
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_breaker_half_open_allows_one_probe_then_closes(clock):
+    breaker = CircuitBreaker(threshold=1, cooldown=30)
+    breaker.record_failure()
+    clock[0] += 29
+    assert not breaker.allow()
+
+    clock[0] += 1
+    assert breaker.allow()
+    assert breaker.state == "half-open"
+    assert not breaker.allow()  # only one probe at a time
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_for_a_full_cooldown(clock):
+    breaker = CircuitBreaker(threshold=5, cooldown=30)
+    breaker.record_failure(trip=True)
+    clock[0] += 30
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    clock[0] += 29
+    assert not breaker.allow()
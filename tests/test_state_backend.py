@@ -0,0 +1,51 @@
+import pytest
+
+from observation import Observation
+from state_backend import MemoryBackend, SQLiteBackend
+
+
+def _observation(observed_at, temp, digest):
+    return Observation("Newcastle", observed_at + 5, observed_at, temp, temp, 50, 1010, 3, "Clear", digest)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    # _PUBLISH_SQL must keep the same rules as MemoryBackend.
+    return MemoryBackend() if request.param == "memory" else SQLiteBackend(str(tmp_path / "state.db"))
+
+
+def test_first_observation_has_no_previous_temp(backend):
+    entry = backend.publish({"k": _observation(100, 10.0, 1)}, 105)["k"]
+    assert entry.record.temp == 10.0 and entry.previous_temp is None
+
+
+def test_newer_observation_replaces_and_remembers_previous_temp(backend):
+    backend.publish({"k": _observation(100, 10.0, 1)}, 105)
+    entry = backend.publish({"k": _observation(200, 12.0, 2)}, 205)["k"]
+    assert entry.record.observed_at == 200
+    assert entry.previous_temp == 10.0
+
+
+def test_older_observation_never_replaces_a_newer_one(backend):
+    backend.publish({"k": _observation(100, 10.0, 1)}, 105)
+    backend.publish({"k": _observation(200, 12.0, 2)}, 205)
+    entry = backend.publish({"k": _observation(100, 10.0, 1)}, 300)["k"]
+    assert entry.record.observed_at == 200 and entry.record.temp == 12.0
+    assert entry.previous_temp == 10.0
+    assert backend.latest(["k"])["k"].record.observed_at == 200
+
+
+def test_repeated_observation_keeps_previous_temp(backend):
+    backend.publish({"k": _observation(100, 10.0, 1)}, 105)
+    backend.publish({"k": _observation(200, 12.0, 2)}, 205)
+    entry = backend.publish({"k": _observation(200, 12.0, 2)}, 400)["k"]
+    assert entry.previous_temp == 10.0
+    assert entry.fetched_at == 400
+
+
+def test_keys_are_independent(backend):
+    backend.publish({"GB|newcastle": _observation(100, 10.0, 1)}, 105)
+    backend.publish({"AU|newcastle": _observation(100, 30.0, 3)}, 105)
+    latest = backend.latest(["GB|newcastle", "AU|newcastle"])
+    assert latest["GB|newcastle"].record.temp == 10.0
+    assert latest["AU|newcastle"].record.temp == 30.0
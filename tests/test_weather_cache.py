@@ -0,0 +1,61 @@
+import threading
+import time
+
+import pytest
+
+from weather_cache import WeatherCache
+
+
+def test_claim_leads_once_and_complete_wakes_waiters():
+    cache = WeatherCache()
+    value, future, leader = cache.claim("k")
+    assert value is None and leader
+    _, waiter, follower = cache.claim("k")
+    assert waiter is future and not follower
+
+    cache.complete("k", "v")
+
+    assert waiter.result(timeout=1) == "v"
+    assert cache.claim("k") == ("v", None, False)
+    assert cache.stats()["inflight"] == 0
+
+
+def test_fail_wakes_waiters_and_releases_the_key():
+    cache = WeatherCache()
+    _, future, _ = cache.claim("k")
+    cache.fail("k", RuntimeError("upstream down"))
+
+    with pytest.raises(RuntimeError):
+        future.result(timeout=1)
+    assert cache.stats()["inflight"] == 0
+    # The next caller leads a new fetch instead of waiting on the failed one.
+    _, retry, leader = cache.claim("k")
+    assert leader and retry is not future
+
+
+def test_uncacheable_value_is_delivered_but_not_stored():
+    cache = WeatherCache()
+    _, future, _ = cache.claim("k")
+    cache.complete("k", None, cacheable=lambda value: value is not None)
+
+    assert future.result(timeout=1) is None
+    assert cache.claim("k")[2]
+
+
+def test_get_or_fetch_coalesces_concurrent_misses():
+    cache = WeatherCache()
+    _, _, leader = cache.claim("k")
+    assert leader
+    results = []
+    calls = []
+    waiter = threading.Thread(target=lambda: results.append(cache.get_or_fetch("k", lambda: calls.append(1))))
+    waiter.start()
+    deadline = time.monotonic() + 1
+    while cache.stats()["coalesced"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    assert cache.stats()["coalesced"] == 1
+    cache.complete("k", "v")
+    waiter.join(timeout=1)
+
+    assert results == ["v"]
+    assert calls == []
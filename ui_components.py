@@ -1,22 +1,54 @@
+import html
+import math
+import time
+import numpy as np
 import streamlit as st
-import pandas as pd
-from utils import get_temp_emoji, get_weather_icon, get_temp_color
-from config import CITIES_BY_REGION
+from utils import TEMP_COLORS, TEMP_THRESHOLDS, get_temp_emoji, get_weather_icon, get_temp_color, format_age
+from config import COUNTRIES_BY_CONTINENT
+from history import weather_history
+from metrics import metrics
+from observation import format_fetched_at
+from comparison import compare, sort_rows
+from forecast import FORECAST_DAYS
+from coordinates import coordinates_for
+from city_index import city_keys
 
+# Selections larger than this render as one batched HTML grid, GRID_PAGE_SIZE cards per page.
+GRID_THRESHOLD = 8
+GRID_PAGE_SIZE = 48
+TABLE_PAGE_SIZE = 50
+DEBUG_SLOWEST_CITIES = 10
+MAP_HEIGHT = 520
+
+COMPARISON_COLUMNS = {
+    "City": "city",
+    "Temp (°C)": "temp",
+    "Feels Like (°C)": "feels_like",
+    "Humidity (%)": "humidity",
+    "Wind (m/s)": "wind",
+    "Pressure (hPa)": "pressure",
+    "Weather": "description",
+}
+# Added to the table when the forecast is shown.
+FORECAST_COLUMNS = {
+    "Tomorrow Min (°C)": "tomorrow_min",
+    "Tomorrow Max (°C)": "tomorrow_max",
+    "Precip 5d (mm)": "precipitation",
+}
+WEEKDAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+
+HISTORY_RANGES = {
+    "Recent": None,
+    "Last 7 days": (7 * 86400, "1h"),
+    "Last 30 days": (30 * 86400, "1d"),
+}
+
+@metrics.timed("weather_phase_seconds", phase="render_country_buttons")
 def render_country_buttons():
     st.sidebar.markdown("#### 🌍 Quick Select by Country")
     
-    regions = {
-        "🌏 Asia & Middle East": ['🇻🇳', '🇯🇵', '🇰🇷', '🇨🇳', '🇹🇭', '🇸🇬', '🇲🇾', '🇮🇩', '🇵🇭', '🇮🇳', '🇦🇪', '🇸🇦', '🇹🇷', '🇮🇱'],
-        "🌎 Americas": ['🇺🇸', '🇨🇦', '🇲🇽', '🇧🇷', '🇦🇷', '🇨🇱', '🇨🇴', '🇵🇪'],
-        "🌍 Europe": ['🇬🇧', '🇫🇷', '🇩🇪', '🇮🇹', '🇪🇸', '🇳🇱', '🇧🇪', '🇨🇭', '🇦🇹', '🇵🇱', '🇨🇿', '🇭🇺', '🇷🇺', '🇺🇦', '🇸🇪', '🇳🇴', '🇩🇰', '🇫🇮', '🇮🇪', '🇵🇹', '🇬🇷'],
-        "🌍 Africa": ['🇪🇬', '🇿🇦', '🇳🇬', '🇰🇪', '🇲🇦', '🇹🇳'],
-        "🌏 Oceania": ['🇦🇺', '🇳🇿']
-    }
-    
-    for region_name, flags in regions.items():
+    for region_name, countries in COUNTRIES_BY_CONTINENT.items():
         with st.sidebar.expander(region_name, expanded=False):
-            countries = [k for k in CITIES_BY_REGION.keys() if any(flag in k for flag in flags)]
             cols = st.columns(2)
             for i, country in enumerate(countries):
                 with cols[i % 2]:
@@ -25,156 +57,322 @@ def render_country_buttons():
                         st.rerun()
 
 
-def render_weather_card(record, show_metrics=True):    
-    city = record['city']
+def _card_state(record, delta=None):
+    # Styling is recomputed only when the observation's digest changes, so an unchanged city
+    # costs a dict lookup per tick. delta comes from the shared state (see state_backend).
+    city = record.city
+    state = st.session_state.card_states.get(city)
+    if state is not None and state['digest'] == record.digest and state['delta'] == delta:
+        return state
     
-    # Calculate temperature delta
-    temp_delta = None
-    if city in st.session_state.prev_temps:
-        temp_delta = record['temp'] - st.session_state.prev_temps[city]
-    st.session_state.prev_temps[city] = record['temp']
+    state = {
+        'digest': record.digest,
+        'delta': delta,
+        'emoji': get_temp_emoji(record.temp),
+        'icon': get_weather_icon(record.description),
+        'color': get_temp_color(record.temp),
+        'html': {},
+    }
+    st.session_state.card_states[city] = state
+    return state
+
+
+def _forecast_days(forecast, i):
+    # (label, low, high, precipitation) per day with data, in the city's local calendar.
+    days = []
+    for d in range(FORECAST_DAYS):
+        if math.isnan(forecast.temp_mean[i, d]):
+            continue
+        # Day 0 of the epoch was a Thursday.
+        label = "Today" if d == 0 else WEEKDAYS[int(forecast.first_day[i] + d + 3) % 7]
+        days.append((label, forecast.temp_min[i, d], forecast.temp_max[i, d], forecast.precipitation[i, d]))
+    return days
+
+
+def _forecast_html(forecast, i):
+    cells = "".join(
+        f"<span><b>{label}</b> {low:.0f}°/{high:.0f}°{f' 💧{rain:.0f}' if rain >= 0.5 else ''}</span>"
+        for label, low, high, rain in _forecast_days(forecast, i)
+    )
+    return f"<div class='wx-forecast'>{cells}</div>" if cells else ""
+
+
+def _age_caption(record, age, max_age):
+    caption = format_fetched_at(record)
+    if age is not None:
+        stale = max_age is not None and age > max_age
+        caption += f" | {'⏳' if stale else '✅'} {format_age(age)}"
+    return caption
+
+
+@metrics.timed("weather_phase_seconds", phase="render_weather_card")
+def render_weather_card(record, show_metrics=True, age=None, max_age=None, delta=None,
+                        forecast=None, forecast_row=None):    
+    city = record.city
     
-    # Get styling elements
-    temp_emoji = get_temp_emoji(record['temp'])
-    weather_icon = get_weather_icon(record['description'])
-    temp_color = get_temp_color(record['temp'])
+    state = _card_state(record, delta)
+    temp_delta = state['delta']
+    temp_emoji = state['emoji']
+    weather_icon = state['icon']
+    temp_color = state['color']
     
     # Card header
-    st.markdown(f"""
-        <div style='background: linear-gradient(135deg, {temp_color}40 0%, {temp_color}15 100%);
-                    border-radius: 20px; padding: 20px; border-left: 4px solid {temp_color};
-                    box-shadow: 0 4px 16px rgba(0,0,0,0.1);
-                    transition: all 0.4s cubic-bezier(0.4, 0, 0.2, 1);
-                    animation: fadeInUp 0.6s ease-out;'>
-            <h3 style='margin: 0; color: white; font-weight: 600; 
-                       letter-spacing: -0.02em; font-size: 1.5rem;'>
-                {weather_icon} {city}
-            </h3>
-        </div>
-    """, unsafe_allow_html=True)
+    st.markdown(f"<div class='wx-card-header' style='--c:{temp_color}'><h3>{weather_icon} {html.escape(city)}</h3></div>",
+                unsafe_allow_html=True)
     
     # Temperature metrics
     col1, col2 = st.columns([2, 1])
     with col1:
         st.metric(
             "Temperature",
-            f"{temp_emoji} {record['temp']:.1f}°C",
+            f"{temp_emoji} {record.temp:.1f}°C",
             delta=f"{temp_delta:+.1f}°C" if temp_delta is not None else None
         )
     with col2:
-        st.metric("Feels Like", f"{record['feels_like']:.1f}°C")
+        st.metric("Feels Like", f"{record.feels_like:.1f}°C")
     
     # Additional metrics
     if show_metrics:
         col3, col4 = st.columns(2)
         with col3:
-            st.markdown(f"**💧 Humidity**  \n{record['humidity']}%")
-            st.markdown(f"**💨 Wind**  \n{record['wind']} m/s")
+            st.markdown(f"**💧 Humidity**  \n{record.humidity}%")
+            st.markdown(f"**💨 Wind**  \n{record.wind} m/s")
         with col4:
-            st.markdown(f"**🔽 Pressure**  \n{record['pressure']} hPa")
-            st.markdown(f"**{weather_icon} Weather**  \n{record['description']}")
+            st.markdown(f"**🔽 Pressure**  \n{record.pressure} hPa")
+            st.markdown(f"**{weather_icon} Weather**  \n{record.description}")
     else:
-        st.markdown(f"**{weather_icon}** {record['description']}")
+        st.markdown(f"**{weather_icon}** {record.description}")
     
-    st.caption(f"📅 {record['date']} | 🕒 {record['time']}")
+    if forecast is not None:
+        days = _forecast_days(forecast, forecast_row)
+        if days:
+            st.caption(" · ".join(f"**{label}** {low:.0f}°/{high:.0f}°" + (f" 💧{rain:.0f} mm" if rain >= 0.5 else "")
+                                  for label, low, high, rain in days))
+    st.caption(_age_caption(record, age, max_age))
     st.divider()
 
 
-def render_comparison_table(current_data):    
-    st.markdown("""
-        <div style='margin: 3rem 0 1rem 0;'>
-            <div style='height: 1px; background: linear-gradient(90deg, 
-                transparent 0%, rgba(255,255,255,0.3) 50%, transparent 100%);'></div>
-        </div>
-    """, unsafe_allow_html=True)
+def _grid_card_html(record, state, show_metrics):
+    weather_icon = state['icon']
+    description = html.escape(record.description)
+    temp_delta = state['delta']
+    delta = ""
+    if temp_delta is not None:
+        delta = f"<span class='wx-delta {'wx-up' if temp_delta >= 0 else 'wx-down'}'>{temp_delta:+.1f}°C</span>"
+    if show_metrics:
+        details = (f"<div class='wx-metrics'><span>💧 {record.humidity}%</span><span>💨 {record.wind} m/s</span>"
+                   f"<span>🔽 {record.pressure} hPa</span><span>{weather_icon} {description}</span></div>")
+    else:
+        details = f"<div class='wx-metrics'><span>{weather_icon} {description}</span></div>"
+    return (f"<div class='wx-card' style='--c:{state['color']}'>"
+            f"<h3>{weather_icon} {html.escape(record.city)}</h3>"
+            f"<div class='wx-temp'>{state['emoji']} {record.temp:.1f}°C {delta}</div>"
+            f"<div class='wx-feels'>Feels like {record.feels_like:.1f}°C</div>"
+            f"{details}")
+
+
+@metrics.timed("weather_phase_seconds", phase="render_weather_grid")
+def render_weather_grid(records, show_metrics=True, ages=None, max_age=None, deltas=None, forecast=None):
+    # Large selections: every card goes out as one HTML element instead of ~10 widgets each.
+    ages = ages or {}
+    deltas = deltas or {}
+    pages = max(1, math.ceil(len(records) / GRID_PAGE_SIZE))
+    page = 1
+    if pages > 1:
+        page = st.select_slider("Page", options=list(range(1, pages + 1)), key="grid_page")
+    first = (page - 1) * GRID_PAGE_SIZE
+    visible = records[first:first + GRID_PAGE_SIZE]
     
-    st.markdown("<h2 style='color: white; font-weight: 600; letter-spacing: -0.02em;'>📊 City Comparison</h2>", 
-                unsafe_allow_html=True)
+    cards = []
+    for i, record in enumerate(visible, start=first):
+        state = _card_state(record, deltas.get(record.city))
+        body = state['html'].get(show_metrics)
+        if body is None:
+            body = state['html'][show_metrics] = _grid_card_html(record, state, show_metrics)
+        strip = _forecast_html(forecast, i) if forecast is not None else ""
+        # Only the forecast strip and the age caption change between ticks for an unchanged observation.
+        cards.append(f"{body}{strip}<div class='wx-caption'>{_age_caption(record, ages.get(record.city), max_age)}</div></div>")
     
-    comparison_df = pd.DataFrame(current_data)
-    comparison_df = comparison_df[['city', 'temp', 'feels_like', 'humidity', 'wind', 'pressure', 'description']]
-    comparison_df.columns = ['City', 'Temp (°C)', 'Feels Like (°C)', 'Humidity (%)', 'Wind (m/s)', 'Pressure (hPa)', 'Weather']
-    
-    st.dataframe(
-        comparison_df.style.format({
-            'Temp (°C)': '{:.1f}',
-            'Feels Like (°C)': '{:.1f}',
-            'Wind (m/s)': '{:.1f}',
-            'Humidity (%)': '{:.0f}',
-            'Pressure (hPa)': '{:.0f}'
-        }).background_gradient(cmap='RdYlBu_r', subset=['Temp (°C)', 'Feels Like (°C)'])
-          .background_gradient(cmap='Blues', subset=['Humidity (%)']),
-        use_container_width=True,
-        hide_index=True
+    st.markdown("<div class='wx-grid'>" + "".join(cards) + "</div>", unsafe_allow_html=True)
+    if pages > 1:
+        st.caption(f"Showing {len(visible)} of {len(records)} cities")
+
+
+def _new_weather_map(cities, region):
+    # Built once per city selection: positions, names, layout and the WebGL trace never change
+    # between ticks, only the colors and the values shown on hover.
+    import plotly.graph_objects as go
+
+    lat, lon = coordinates_for(list(cities), region)
+    unplaced = int(np.isnan(lat).sum())
+    fig = go.Figure(go.Scattergl(
+        x=lon, y=lat, text=list(cities), mode="markers",
+        marker=dict(size=9, line=dict(width=0.5, color="rgba(255,255,255,0.6)")),
+        hovertemplate="<b>%{text}</b><br>%{customdata[0]:.1f}°C, feels %{customdata[1]:.1f}°C"
+                      "<br>%{customdata[2]:.0f}% humidity<extra></extra>",
+    ))
+    axis = dict(showgrid=True, gridcolor="rgba(255,255,255,0.08)", zeroline=False, showticklabels=False)
+    fig.update_layout(
+        template="plotly_dark", height=MAP_HEIGHT, margin=dict(l=0, r=0, t=0, b=0),
+        paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(255,255,255,0.03)",
+        xaxis=dict(axis, range=[-180, 180]), yaxis=dict(axis, range=[-60, 75], scaleanchor="x"),
+        # A constant uirevision keeps the user's zoom and pan across refreshes.
+        uirevision="weather_map", dragmode="pan",
     )
+    return fig, unplaced
+
+
+@metrics.timed("weather_phase_seconds", phase="render_weather_map")
+def render_weather_map(records, region=None):
+    # Every selected city as one WebGL scatter over longitude/latitude, colored by get_temp_color's bands.
+    cities = tuple(record.city for record in records)
+    cached = st.session_state.get("weather_map")
+    if cached is None or cached[0] != (cities, region):
+        cached = st.session_state.weather_map = ((cities, region), *_new_weather_map(cities, region))
+    _, fig, unplaced = cached
+
+    temp = np.fromiter((r.temp for r in records), dtype=float, count=len(records))
+    trace = fig.data[0]
+    trace.marker.color = np.asarray(TEMP_COLORS)[np.searchsorted(TEMP_THRESHOLDS, temp, side="right")]
+    trace.customdata = np.column_stack([
+        temp, [r.feels_like for r in records], [r.humidity for r in records],
+    ])
+    st.plotly_chart(fig, theme=None, key="weather_map_chart", config={"scrollZoom": True, "displaylogo": False})
+    if unplaced:
+        st.caption(f"{unplaced} cit{'y' if unplaced == 1 else 'ies'} without coordinates not shown")
+
+
+def _forecast_cells_html(c, i):
+    return "".join(f"<td class='wx-num'>{'–' if math.isnan(c[field][i]) else f'{c[field][i]:.1f}'}</td>"
+                   for field in FORECAST_COLUMNS.values())
+
+
+def _comparison_row_html(comparison, i):
+    c = comparison.columns
+    forecast = _forecast_cells_html(c, i) if "precipitation" in c else ""
+    return (f"<tr><td>{html.escape(c['city'][i])}</td>"
+            f"<td class='wx-heat' style='--c:{comparison.temp_colors[i]}'>{c['temp'][i]:.1f}</td>"
+            f"<td class='wx-heat' style='--c:{comparison.feels_colors[i]}'>{c['feels_like'][i]:.1f}</td>"
+            f"<td class='wx-humid' style='--a:{comparison.humidity_alpha[i]:.2f}'>{c['humidity'][i]:.0f}</td>"
+            f"<td>{c['wind'][i]:.1f}</td><td>{c['pressure'][i]:.0f}</td>"
+            f"<td>{html.escape(c['description'][i])}</td>{forecast}</tr>")
+
+
+@metrics.timed("weather_phase_seconds", phase="render_comparison_table")
+def render_comparison_table(current_data, forecast=None):    
+    st.markdown("<div class='wx-divider'></div><h2 class='wx-section'>📊 City Comparison</h2>", unsafe_allow_html=True)
+    
+    # Colors, rankings and sort order come from whole-column NumPy operations; only the
+    # visible page is turned into HTML.
+    comparison = compare(current_data, forecast=forecast)
+    columns = {**COMPARISON_COLUMNS, **FORECAST_COLUMNS} if forecast is not None else COMPARISON_COLUMNS
+    sort_col, order_col = st.columns([3, 1])
+    with sort_col:
+        sort_label = st.selectbox("Sort by", list(columns.keys()), key="comparison_sort")
+    with order_col:
+        descending = st.checkbox("Descending", value=sort_label != "City", key="comparison_desc")
+    order = sort_rows(comparison, columns[sort_label], descending)
+    
+    pages = max(1, math.ceil(len(order) / TABLE_PAGE_SIZE))
+    page = 1
+    if pages > 1:
+        page = st.select_slider("Table page", options=list(range(1, pages + 1)), key="comparison_page")
+    visible = order[(page - 1) * TABLE_PAGE_SIZE:page * TABLE_PAGE_SIZE]
+    
+    header = "".join(f"<th>{html.escape(label)}</th>" for label in columns)
+    rows = "".join(_comparison_row_html(comparison, i) for i in visible)
+    st.markdown(f"<div class='wx-table-wrap'><table class='wx-table'><thead><tr>{header}</tr></thead>"
+                f"<tbody>{rows}</tbody></table></div>", unsafe_allow_html=True)
+    if pages > 1:
+        st.caption(f"Showing {len(visible)} of {len(order)} cities")
     
     # Statistics
+    c = comparison.columns
+    hottest = comparison.top['temp'][0]
+    coldest = comparison.coldest[0]
+    most_humid = comparison.top['humidity'][0]
+    windiest = comparison.top['wind'][0]
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        hottest = comparison_df.loc[comparison_df['Temp (°C)'].idxmax()]
-        st.metric("🔥 Hottest City", hottest['City'], f"{hottest['Temp (°C)']:.1f}°C")
+        st.metric("🔥 Hottest City", c['city'][hottest], f"{c['temp'][hottest]:.1f}°C")
     with col2:
-        coldest = comparison_df.loc[comparison_df['Temp (°C)'].idxmin()]
-        st.metric("🥶 Coldest City", coldest['City'], f"{coldest['Temp (°C)']:.1f}°C")
+        st.metric("🥶 Coldest City", c['city'][coldest], f"{c['temp'][coldest]:.1f}°C")
     with col3:
-        most_humid = comparison_df.loc[comparison_df['Humidity (%)'].idxmax()]
-        st.metric("💧 Most Humid", most_humid['City'], f"{most_humid['Humidity (%)']:.0f}%")
+        st.metric("💧 Most Humid", c['city'][most_humid], f"{c['humidity'][most_humid]:.0f}%")
     with col4:
-        windiest = comparison_df.loc[comparison_df['Wind (m/s)'].idxmax()]
-        st.metric("💨 Windiest", windiest['City'], f"{windiest['Wind (m/s)']:.1f} m/s")
+        st.metric("💨 Windiest", c['city'][windiest], f"{c['wind'][windiest]:.1f} m/s")
+    
+    if len(order) > len(comparison.coldest):
+        st.caption("🔥 Warmest: " + ", ".join(f"{c['city'][i]} ({c['temp'][i]:.1f}°C)" for i in comparison.top['temp']))
+        st.caption("🥶 Coldest: " + ", ".join(f"{c['city'][i]} ({c['temp'][i]:.1f}°C)" for i in comparison.coldest))
+
+
+@metrics.timed("weather_phase_seconds", phase="render_history_chart")
+def render_history_chart(cities, region=None):
+    st.markdown("<div class='wx-divider'></div><h2 class='wx-section'>📈 Temperature History</h2>", unsafe_allow_html=True)
+    
+    # Only this chart needs pandas; importing it here keeps it off the start-up path.
+    import pandas as pd
+
+    span = st.radio("History range", list(HISTORY_RANGES.keys()), horizontal=True,
+                    label_visibility="collapsed")
+    
+    series = {}
+    keys = city_keys(cities, region)
+    for city in cities:
+        if HISTORY_RANGES[span] is None:
+            window = weather_history.window(keys[city])
+        else:
+            # Longer spans come from the on-disk rollups, not the in-memory ring.
+            seconds, resolution = HISTORY_RANGES[span]
+            now = time.time()
+            window = weather_history.load_range(keys[city], now - seconds, now, resolution)
+        if window is not None and len(window['timestamp']) > 1:
+            series[city] = pd.Series(window['temp'], index=pd.to_datetime(window['timestamp'], unit='s'))
+    
+    if not series:
+        st.info("History will appear after a few refreshes.")
+        return
+    
+    st.line_chart(pd.DataFrame(series), y_label="Temp (°C)")
+
+
+def _metrics_table(rows, label):
+    lines = [f"| {label} | Count | Mean (ms) | p50 (ms) | p95 (ms) |", "|---|---:|---:|---:|---:|"]
+    for name, h in rows:
+        lines.append(f"| {name} | {h.count} | {h.sum / h.count * 1000:.1f} | "
+                     f"{h.quantile(0.5) * 1000:.1f} | {h.quantile(0.95) * 1000:.1f} |")
+    return "\n".join(lines)
+
+
+def render_debug_panel():
+    # Process-wide numbers: every session served by this replica contributes.
+    phases = metrics.histograms("weather_phase_seconds")
+    cities = metrics.histograms("weather_city_fetch_seconds")
+    with st.sidebar.expander("🐞 Debug metrics", expanded=True):
+        if not phases:
+            st.caption("No timings recorded yet.")
+            return
+        by_time = sorted(phases.items(), key=lambda item: -item[1].sum)
+        st.markdown(_metrics_table([(dict(labels)["phase"], h) for labels, h in by_time], "Phase"))
+        slowest = sorted(cities.items(), key=lambda item: -item[1].quantile(0.95))[:DEBUG_SLOWEST_CITIES]
+        if slowest:
+            st.markdown(_metrics_table([(dict(labels)["city"], h) for labels, h in slowest], "Slowest cities"))
 
 
+@metrics.timed("weather_phase_seconds", phase="render_header")
 def render_header():
-    st.markdown("""
-        <div style='text-align: center; animation: fadeInUp 0.5s ease-out;'>
-            <h1 style='font-size: 4rem; margin-bottom: 0; font-weight: 700; 
-                       background: linear-gradient(135deg, #fff 0%, rgba(255,255,255,0.8) 100%);
-                       -webkit-background-clip: text; -webkit-text-fill-color: transparent;
-                       background-clip: text; letter-spacing: -0.04em;'>
-                🌤️ Weather Dashboard
-            </h1>
-            <p style='color: rgba(255,255,255,0.85); font-size: 1.3rem; margin-top: 10px;
-                      font-weight: 400; letter-spacing: -0.02em;'>
-                Real-time weather data with beautiful animations
-            </p>
-        </div>
-    """, unsafe_allow_html=True)
+    st.markdown("<div class='wx-hero'><h1>🌤️ Weather Dashboard</h1>"
+                "<p>Real-time weather data with beautiful animations</p></div>", unsafe_allow_html=True)
 
 
+@metrics.timed("weather_phase_seconds", phase="render_footer")
 def render_footer():
     st.markdown("""
-        <div style='margin-top: 4rem;'>
-            <div style='height: 1px; background: linear-gradient(90deg, 
-                transparent 0%, rgba(255,255,255,0.3) 50%, transparent 100%);'></div>
-        </div>
-    """, unsafe_allow_html=True)
-    
-    st.markdown("""
-        <div style='text-align: center; color: rgba(255,255,255,0.7); padding: 40px 20px;
-                    animation: fadeInUp 1s ease-out;'>
-            <p style='margin: 8px; font-size: 0.95rem; font-weight: 400; letter-spacing: -0.01em;'>
-                ⚡ Data provided by <a href='https://openweathermap.org/' 
-                   style='color: rgba(255,255,255,0.9); text-decoration: none; 
-                          border-bottom: 1px solid rgba(255,255,255,0.3);
-                          transition: all 0.3s ease;'
-                   onmouseover='this.style.borderBottom="1px solid rgba(255,255,255,0.8)"'
-                   onmouseout='this.style.borderBottom="1px solid rgba(255,255,255,0.3)"'>
-                   OpenWeather API
-                </a>
-            </p>
-            <p style='margin: 8px; font-size: 0.95rem; font-weight: 400; letter-spacing: -0.01em;'>
-                🚀 Built with <a href='https://streamlit.io/' 
-                   style='color: rgba(255,255,255,0.9); text-decoration: none;
-                          border-bottom: 1px solid rgba(255,255,255,0.3);
-                          transition: all 0.3s ease;'
-                   onmouseover='this.style.borderBottom="1px solid rgba(255,255,255,0.8)"'
-                   onmouseout='this.style.borderBottom="1px solid rgba(255,255,255,0.3)"'>
-                   Streamlit
-                </a>
-            </p>
-            <p style='margin: 16px 0 0 0; font-size: 0.85rem; opacity: 0.6; 
-                      font-weight: 300; letter-spacing: 0.02em;'>
-                Designed with ❤️ for weather enthusiasts
-            </p>
+        <div class='wx-divider wx-footer-rule'></div>
+        <div class='wx-footer'>
+            <p>⚡ Data provided by <a href='https://openweathermap.org/'>OpenWeather API</a></p>
+            <p>🚀 Built with <a href='https://streamlit.io/'>Streamlit</a></p>
+            <p class='wx-credit'>Designed with ❤️ for weather enthusiasts</p>
         </div>
     """, unsafe_allow_html=True)
@@ -1,24 +1,17 @@
-from typing import Dict, Optional
-import requests
+import bisect
+import uuid
 import streamlit as st
-from datetime import datetime
 
-# Application settings
-REQUEST_TIMEOUT = 10
-MAX_RETRIES = 2
+from weather_api import FetchResult
 
 # Temperature thresholds
 TEMP_COLD = 10
 TEMP_COOL = 20
 TEMP_WARM = 25
 TEMP_HOT = 30
-
-def validate_api_key(api_key: Optional[str]) -> bool:
-    if not api_key:
-        return False
-    if len(api_key) < 10:
-        return False
-    return True
+# get_temp_color's palette, one color per band between the thresholds above.
+TEMP_THRESHOLDS = (TEMP_COLD, TEMP_COOL, TEMP_WARM, TEMP_HOT)
+TEMP_COLORS = ("#3498db", "#2ecc71", "#f39c12", "#e67e22", "#e74c3c")
 
 def get_temp_emoji(temp: float) -> str:
     if temp < TEMP_COLD:
@@ -51,77 +44,24 @@ def get_weather_icon(description: str) -> str:
 
 
 def get_temp_color(temp: float) -> str:
-    if temp < TEMP_COLD:
-        return "#3498db"
-    elif temp < TEMP_COOL:
-        return "#2ecc71"
-    elif temp < TEMP_WARM:
-        return "#f39c12"
-    elif temp < TEMP_HOT:
-        return "#e67e22"
-    else:
-        return "#e74c3c"
-
-
-def fetch_weather(city: str, api_key: Optional[str], base_url: str) -> Optional[Dict]:
-    if not validate_api_key(api_key):
-        st.error("Missing or invalid API key.")
-        return None
+    return TEMP_COLORS[bisect.bisect_right(TEMP_THRESHOLDS, temp)]
 
-    params = {
-        "q": city.strip(),
-        "appid": api_key,
-        "units": "metric",
-    }
 
-    for attempt in range(MAX_RETRIES):
-        try:
-            resp = requests.get(base_url, params=params, timeout=REQUEST_TIMEOUT)
-            resp.raise_for_status()
-            data = resp.json()
-
-            if "main" not in data or "weather" not in data:
-                st.error(f"Invalid API response for {city}")
-                return None
+def format_age(seconds: float) -> str:
+    if seconds < 60:
+        return f"{int(seconds)}s ago"
+    elif seconds < 3600:
+        return f"{int(seconds // 60)}m ago"
+    else:
+        return f"{int(seconds // 3600)}h ago"
 
-            main = data["main"]
-            weather_desc = data["weather"][0]["description"].title()
-            wind_speed = data.get("wind", {}).get("speed", 0)
-            now = datetime.now()
 
-            return {
-                "city": city,
-                "time": now.strftime("%H:%M:%S"),
-                "date": now.strftime("%Y-%m-%d"),
-                "temp": main["temp"],
-                "feels_like": main["feels_like"],
-                "humidity": main["humidity"],
-                "pressure": main["pressure"],
-                "wind": wind_speed,
-                "description": weather_desc,
-            }
-        except requests.exceptions.Timeout:
-            if attempt < MAX_RETRIES - 1:
-                continue
-            st.warning(f"Timeout fetching data for {city}.")
-            return None
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 404:
-                st.error(f"❌ City '{city}' not found.")
-            elif e.response.status_code == 401:
-                st.error("❌ Invalid API key.")
-            else:
-                st.error(f"❌ HTTP error for {city}: {e}")
-            return None
-        except requests.exceptions.RequestException as e:
-            st.error(f"Network error for {city}: {str(e)}")
-            return None
-        except (KeyError, IndexError, ValueError) as e:
-            st.error(f"Error parsing data for {city}: {str(e)}")
-            return None
-    
-    return None
+def report_fetch_error(result: FetchResult):
+    if result.error:
+        getattr(st, result.level)(result.error)
 
 def init_session_state():
-    if "prev_temps" not in st.session_state:
-        st.session_state.prev_temps = {}
+    if "card_states" not in st.session_state:
+        st.session_state.card_states = {}
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
@@ -0,0 +1,293 @@
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import requests
+
+from cadence import cadence
+from city_index import city_keys, region_country_code, resolve_city_ids
+from config import CITY_REGIONS, normalize_city
+from history import weather_history
+from http_client import CircuitOpenError, get_json
+from metrics import metrics
+from observation import Observation
+from weather_cache import WeatherCache, weather_cache
+
+# Application settings
+REQUEST_TIMEOUT = 10
+MAX_RETRIES = 2
+MAX_CONCURRENT_REQUESTS = 8
+UNITS = "metric"
+GROUP_BATCH_SIZE = 20
+
+# Rejected city names (404 not found, 400 bad query) are remembered for this long.
+NEGATIVE_STATUSES = frozenset({400, 404})
+NEGATIVE_CACHE_TTL = 600
+negative_cache = WeatherCache(ttl=NEGATIVE_CACHE_TTL, max_age=NEGATIVE_CACHE_TTL)
+metrics.add_collector(lambda: {f"weather_cache_{name}": value for name, value in weather_cache.stats().items()})
+
+def validate_api_key(api_key: Optional[str]) -> bool:
+    if not api_key:
+        return False
+    if len(api_key) < 10:
+        return False
+    return True
+
+class FetchResult(NamedTuple):
+    city: str
+    record: Optional[Observation] = None
+    error: Optional[str] = None
+    level: str = "error"
+    status: Optional[int] = None
+
+
+def _city_label(city: str) -> str:
+    # Metric labels must stay bounded: every name typed into "Add Custom City" shares one series.
+    name = city.rsplit(",", 1)[0]
+    return name if name in CITY_REGIONS else "custom"
+
+
+def _query_name(city: str, key: str) -> str:
+    # "?q=Newcastle" picks one of the two; a name listed in several regions carries the country
+    # of the one its key stands for, which also keeps their cache entries apart.
+    if len(CITY_REGIONS.get(city, ())) < 2:
+        return city
+    return f"{city},{region_country_code(key.split('|', 1)[0])}"
+
+
+def _get_json(url: str, params: Dict) -> Dict:
+    return get_json(url, params, timeout=REQUEST_TIMEOUT, attempts=MAX_RETRIES)
+
+
+@metrics.timed("weather_phase_seconds", phase="parse")
+def _parse_weather(city: str, data: Dict) -> FetchResult:
+    if "main" not in data or "weather" not in data:
+        return FetchResult(city, error=f"Invalid API response for {city}")
+
+    try:
+        main = data["main"]
+        weather_desc = data["weather"][0]["description"].title()
+        wind_speed = data.get("wind", {}).get("speed", 0)
+        observation = (main["temp"], main["feels_like"], main["humidity"], main["pressure"],
+                       wind_speed, weather_desc)
+
+        return FetchResult(city, Observation(
+            city, time.time(), data.get("dt"), *observation,
+            # Stable across processes (unlike hash()) so replicas agree on what changed.
+            digest=zlib.crc32(repr(observation).encode("utf-8")),
+        ))
+    except (KeyError, IndexError, ValueError) as e:
+        return FetchResult(city, error=f"Error parsing data for {city}: {str(e)}")
+
+
+def _error_result(city: str, e: Exception) -> FetchResult:
+    if isinstance(e, CircuitOpenError):
+        return FetchResult(city, error=f"⚠️ {e}", level="warning")
+    if isinstance(e, requests.exceptions.Timeout):
+        return FetchResult(city, error=f"Timeout fetching data for {city}.", level="warning")
+    if isinstance(e, requests.exceptions.HTTPError):
+        status = e.response.status_code
+        if status == 404:
+            return FetchResult(city, error=f"❌ City '{city}' not found.", status=status)
+        elif status == 401:
+            return FetchResult(city, error="❌ Invalid API key.", status=status)
+        return FetchResult(city, error=f"❌ HTTP error for {city}: {e}", status=status)
+    if isinstance(e, requests.exceptions.RequestException):
+        return FetchResult(city, error=f"Network error for {city}: {str(e)}")
+    return FetchResult(city, error=f"Error parsing data for {city}: {str(e)}")
+
+
+def request_weather(city: str, api_key: Optional[str], base_url: str) -> FetchResult:
+    if not validate_api_key(api_key):
+        return FetchResult(city, error="Missing or invalid API key.")
+
+    params = {
+        "q": city.strip(),
+        "appid": api_key,
+        "units": UNITS,
+    }
+
+    try:
+        with metrics.timer("weather_city_fetch_seconds", city=_city_label(city)):
+            data = _get_json(base_url, params)
+    except (requests.exceptions.RequestException, ValueError) as e:
+        return _error_result(city, e)
+    return _parse_weather(city, data)
+
+
+def group_url_for(base_url: str) -> str:
+    return base_url.rsplit("/", 1)[0] + "/group"
+
+
+def request_weather_group(batch: List[Tuple[str, int]], api_key: Optional[str],
+                          base_url: str) -> List[FetchResult]:
+    # One /group call for up to GROUP_BATCH_SIZE catalog cities, matched back by city ID.
+    if not validate_api_key(api_key):
+        return [FetchResult(city, error="Missing or invalid API key.") for city, _ in batch]
+
+    params = {
+        "id": ",".join(str(city_id) for _, city_id in batch),
+        "appid": api_key,
+        "units": UNITS,
+    }
+
+    start = time.perf_counter()
+    try:
+        data = _get_json(group_url_for(base_url), params)
+        by_id = {item["id"]: item for item in data.get("list", [])}
+        # Every city in the batch waited for the whole request.
+        elapsed = time.perf_counter() - start
+        for city, _ in batch:
+            metrics.observe("weather_city_fetch_seconds", elapsed, city=_city_label(city))
+    except (requests.exceptions.RequestException, ValueError, KeyError, TypeError) as e:
+        return [_error_result(city, e) for city, _ in batch]
+
+    return [
+        _parse_weather(city, by_id[city_id]) if city_id in by_id
+        else FetchResult(city, error=f"No data returned for {city}")
+        for city, city_id in batch
+    ]
+
+def _with_fallback(key, result: FetchResult) -> FetchResult:
+    # On a transient failure (outage, open circuit) serve the last good record we still hold.
+    if result.record is not None or result.status in NEGATIVE_STATUSES:
+        return result
+    cached = weather_cache.get(key, max_age=weather_cache.max_age)
+    if cached is None:
+        return result
+    return result._replace(record=cached.record, level="warning")
+
+
+def request_weather_cached(city: str, api_key: Optional[str], base_url: str,
+                           max_age: Optional[float] = None) -> FetchResult:
+    key = (normalize_city(city), UNITS)
+    # Names the API has rejected recently are not worth another round-trip.
+    rejected = negative_cache.get(key)
+    if rejected is not None:
+        return renamed(rejected, city)
+
+    # One upstream call per normalized city across all sessions; concurrent misses coalesce.
+    result = weather_cache.get_or_fetch(
+        key,
+        lambda: request_weather(city, api_key, base_url),
+        max_age=max_age,
+        cacheable=lambda r: r.record is not None,
+    )
+    if result.status in NEGATIVE_STATUSES:
+        negative_cache.put(key, result)
+    return renamed(_with_fallback(key, result), city)
+
+def renamed(result: FetchResult, city: str) -> FetchResult:
+    if result.city == city:
+        return result
+    record = result.record._replace(city=city) if result.record else None
+    return result._replace(city=city, record=record)
+
+
+@metrics.timed("weather_phase_seconds", phase="fetch")
+def fetch_weather_many(cities: List[str], api_key: Optional[str], base_url: str,
+                       max_workers: int = MAX_CONCURRENT_REQUESTS,
+                       max_age: Optional[float] = None,
+                       region: Optional[str] = None) -> List[FetchResult]:
+    # Workers never touch st.*; callers report errors from the script thread.
+    if not cities:
+        return []
+
+    # Catalog cities with a known ID go through /group, GROUP_BATCH_SIZE per request;
+    # anything else (custom input, no index built) falls back to one ?q= call per city.
+    city_ids = resolve_city_ids(cities, region)
+    keys = city_keys(cities, region, ids=city_ids)
+    results: Dict[str, FetchResult] = {}
+    pending: List[Tuple[str, int]] = []
+    waiting: Dict[str, Future] = {}
+    by_name: List[Tuple[str, Optional[float]]] = []
+    now = time.time()
+    for city in dict.fromkeys(cities):
+        # Until the provider is expected to have published a newer observation, whatever is
+        # cached is as fresh as an upstream call would be.
+        city_max_age = max_age if cadence.new_data_expected(keys[city], now) else weather_cache.max_age
+        city_id = city_ids.get(city)
+        if city_id is None:
+            by_name.append((city, city_max_age))
+            continue
+        # Single-flight per ID: only the IDs this call leads go into its /group batches; IDs
+        # another session is already fetching are waited on instead.
+        cached, future, leader = weather_cache.claim(("id", city_id, UNITS), city_max_age)
+        if future is None:
+            results[city] = renamed(cached, city)
+        elif leader:
+            pending.append((city, city_id))
+        else:
+            waiting[city] = future
+
+    batches = [pending[i:i + GROUP_BATCH_SIZE] for i in range(0, len(pending), GROUP_BATCH_SIZE)]
+    workers = max(1, min(max_workers, len(batches) + len(by_name)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="weather-fetch") as pool:
+        group_futures = [pool.submit(request_weather_group, batch, api_key, base_url) for batch in batches]
+        name_futures = {city: pool.submit(request_weather_cached, _query_name(city, keys[city]), api_key,
+                                          base_url, city_max_age)
+                        for city, city_max_age in by_name}
+
+        unresolved = {("id", city_id, UNITS) for _, city_id in pending}
+        try:
+            for batch, future in zip(batches, group_futures):
+                for (city, city_id), result in zip(batch, future.result()):
+                    key = ("id", city_id, UNITS)
+                    unresolved.discard(key)
+                    weather_cache.complete(key, result, cacheable=lambda r: r.record is not None)
+                    results[city] = _with_fallback(key, result)
+        except BaseException as e:
+            # Never leave a claimed ID in flight: other sessions are waiting on it.
+            for key in unresolved:
+                weather_cache.fail(key, e)
+            raise
+        for city, future in waiting.items():
+            key = ("id", city_ids[city], UNITS)
+            results[city] = renamed(_with_fallback(key, future.result()), city)
+        for city, future in name_futures.items():
+            results[city] = renamed(future.result(), city)
+
+    fetched_at = time.time()
+    for city, result in results.items():
+        if result.record is not None:
+            cadence.observe(keys[city], result.record.observed_at, fetched_at)
+        if result.error:
+            metrics.inc("weather_fetch_errors_total", level=result.level)
+    weather_history.record_many({keys[city]: r.record for city, r in results.items() if r.record is not None})
+    return [results[city] for city in cities]
+
+
+def _region_chunks(pairs: Iterable[Tuple[str, Optional[str]]]) -> Iterator[Tuple[Optional[str], List[str]]]:
+    # Consecutive cities of one region, GROUP_BATCH_SIZE at a time, so each chunk is one /group call.
+    region, chunk = None, []
+    for city, city_region in pairs:
+        if chunk and (city_region != region or len(chunk) == GROUP_BATCH_SIZE):
+            yield region, chunk
+            chunk = []
+        region = city_region
+        chunk.append(city)
+    if chunk:
+        yield region, chunk
+
+
+def stream_weather(pairs: Iterable[Tuple[str, Optional[str]]], api_key: Optional[str], base_url: str,
+                   max_workers: int = MAX_CONCURRENT_REQUESTS,
+                   max_age: Optional[float] = None) -> Iterator[Tuple[Optional[str], FetchResult]]:
+    # pairs: (city, region or None), read lazily; yields (region, result), so a name listed in two
+    # regions stays tied to the one it was asked for. At most max_workers chunks are in flight and
+    # results come out as chunks finish, so memory stays flat however long the input is.
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="weather-stream") as pool:
+        regions = {}
+        for region, chunk in _region_chunks(pairs):
+            regions[pool.submit(fetch_weather_many, chunk, api_key, base_url, 1, max_age, region)] = region
+            if len(regions) >= max_workers:
+                done, _ = wait(regions, return_when=FIRST_COMPLETED)
+                for future in done:
+                    region = regions.pop(future)
+                    yield from ((region, result) for result in future.result())
+        while regions:
+            done, _ = wait(regions, return_when=FIRST_COMPLETED)
+            for future in done:
+                region = regions.pop(future)
+                yield from ((region, result) for result in future.result())
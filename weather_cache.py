@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from config import REFRESH_OPTIONS
+
+# Entries are fresh for the shortest refresh interval any viewer can pick and are
+# dropped once even the slowest interval would refetch them.
+CACHE_TTL = min(REFRESH_OPTIONS.values())
+CACHE_MAX_AGE = max(REFRESH_OPTIONS.values())
+CACHE_MAX_ENTRIES = 2000
+
+
+class WeatherCache:
+    def __init__(self, ttl: float = CACHE_TTL, max_age: float = CACHE_MAX_AGE,
+                 max_entries: int = CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[float, object]]" = OrderedDict()
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+
+    def get(self, key: Hashable, max_age: Optional[float] = None):
+        with self._lock:
+            return self._lookup(key, self.ttl if max_age is None else max_age)
+
+    def put(self, key: Hashable, value):
+        with self._lock:
+            self._store(key, value)
+
+    def get_or_fetch(self, key: Hashable, fetch: Callable[[], object],
+                     max_age: Optional[float] = None, cacheable: Callable[[object], bool] = bool):
+        value, future, leader = self.claim(key, max_age)
+        if future is None:
+            return value
+        if not leader:
+            return future.result()
+
+        try:
+            value = fetch()
+        except BaseException as e:
+            self.fail(key, e)
+            raise
+        self.complete(key, value, cacheable)
+        return value
+
+    def claim(self, key: Hashable, max_age: Optional[float] = None) -> Tuple[object, Optional[Future], bool]:
+        # (value, None, False) on a hit. Otherwise the key's in-flight future and whether this
+        # caller leads it: a leader must finish it with complete() or fail(), everyone else
+        # waits on it. Lets a caller batch several missing keys into one upstream request.
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            value = self._lookup(key, max_age)
+            if value is not None:
+                self._counters["hits"] += 1
+                return value, None, False
+            future = self._inflight.get(key)
+            if future is not None:
+                self._counters["coalesced"] += 1
+                return None, future, False
+            self._counters["misses"] += 1
+            future = self._inflight[key] = Future()
+            return None, future, True
+
+    def complete(self, key: Hashable, value, cacheable: Callable[[object], bool] = bool):
+        with self._lock:
+            if cacheable(value):
+                self._store(key, value)
+            future = self._inflight.pop(key)
+        future.set_result(value)
+
+    def fail(self, key: Hashable, error: BaseException):
+        with self._lock:
+            future = self._inflight.pop(key)
+        future.set_exception(error)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._counters, "size": len(self._entries), "inflight": len(self._inflight)}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _lookup(self, key: Hashable, max_age: float):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        age = time.monotonic() - stored_at
+        if age > self.max_age:
+            del self._entries[key]
+            return None
+        if age > max_age:
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key: Hashable, value):
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+
+weather_cache = WeatherCache()